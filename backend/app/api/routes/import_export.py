@@ -140,12 +140,11 @@ async def export_students(
     
     try:
         if format == "csv":
-            content = await service.export_students_to_csv(
-                tenant_id=str(current_user.tenant_id),
-                status=student_status,
-            )
             return StreamingResponse(
-                BytesIO(content),
+                service.stream_students_csv(
+                    tenant_id=str(current_user.tenant_id),
+                    status=student_status,
+                ),
                 media_type="text/csv",
                 headers={
                     "Content-Disposition": f"attachment; filename=students_export_{current_user.tenant_id}.csv"
@@ -181,15 +180,28 @@ async def export_students(
 
 @router.get("/export/fees")
 async def export_fees(
+    format: str = Query("csv", regex="^(csv|zip)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Export fees to CSV."""
+    """
+    Export fees to CSV.
+    
+    - **format**: csv for a single file, zip for one CSV per payment month
+    """
     service = ImportExportService(db)
     try:
-        content = await service.export_fees_to_csv(str(current_user.tenant_id))
+        if format == "zip":
+            content = await service.export_fees_to_zip(str(current_user.tenant_id))
+            return StreamingResponse(
+                BytesIO(content),
+                media_type="application/zip",
+                headers={
+                    "Content-Disposition": f"attachment; filename=fees_export_{current_user.tenant_id}.zip"
+                }
+            )
         return StreamingResponse(
-            BytesIO(content),
+            service.stream_fees_csv(str(current_user.tenant_id)),
             media_type="text/csv",
             headers={
                 "Content-Disposition": f"attachment; filename=fees_export_{current_user.tenant_id}.csv"
@@ -203,15 +215,15 @@ async def export_fees(
 
 @router.get("/export/attendance")
 async def export_attendance(
+    sort: bool = Query(False, description="Order rows by date, newest first"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Export attendance to CSV."""
     service = ImportExportService(db)
     try:
-        content = await service.export_attendance_to_csv(str(current_user.tenant_id))
         return StreamingResponse(
-            BytesIO(content),
+            service.stream_attendance_csv(str(current_user.tenant_id), sort=sort),
             media_type="text/csv",
             headers={
                 "Content-Disposition": f"attachment; filename=attendance_export_{current_user.tenant_id}.csv"
@@ -262,10 +262,8 @@ async def export_staff(
 ):
     """Export staff to CSV."""
     service = ImportExportService(db)
-    content = await service.export_staff_to_csv(current_user.tenant_id)
-    
     return StreamingResponse(
-        io.BytesIO(content),
+        service.stream_staff_csv(current_user.tenant_id),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=staff_export_{date.today()}.csv"}
     )
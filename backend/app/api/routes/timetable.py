@@ -553,10 +553,8 @@ async def export_timetable(
 ):
     """Export timetable to CSV."""
     service = ImportExportService(db)
-    content = await service.export_timetable_to_csv(current_user.tenant_id)
-    
     return StreamingResponse(
-        io.BytesIO(content),
+        service.stream_timetable_csv(current_user.tenant_id),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=timetable_export_{date.today()}.csv"}
     )
@@ -161,10 +161,8 @@ async def export_classes(
 ):
     """Export classes to CSV."""
     service = ImportExportService(db)
-    content = await service.export_classes_to_csv(tenant.id)
-    
     return StreamingResponse(
-        io.BytesIO(content),
+        service.stream_classes_csv(tenant.id),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=classes_export_{datetime.now().date()}.csv"}
     )
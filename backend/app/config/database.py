@@ -35,12 +35,16 @@ if _needs_ssl:
 
 # Create async engine
 # pool_pre_ping: reconnects if Neon closed an idle connection
+# insertmanyvalues_page_size: bulk INSERTs that need RETURNING (ORM flushes of many
+#   new rows) are sent as multi-row INSERT ... VALUES pages of this size. Plain Core
+#   executemany INSERTs (bulk imports) go through asyncpg's pipelined executemany.
 engine = create_async_engine(
     _db_url,
     pool_size=min(settings.DATABASE_POOL_SIZE, 5),   # Neon free tier: low connection limit
     max_overflow=min(settings.DATABASE_MAX_OVERFLOW, 5),
     echo=settings.DATABASE_ECHO,
     pool_pre_ping=True,
+    insertmanyvalues_page_size=settings.DATABASE_INSERTMANYVALUES_PAGE_SIZE,
     connect_args=_connect_args,
     future=True
 )
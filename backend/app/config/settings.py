@@ -28,6 +28,7 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
     DATABASE_ECHO: bool = False
+    DATABASE_INSERTMANYVALUES_PAGE_SIZE: int = 1000  # rows per batched INSERT ... RETURNING
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
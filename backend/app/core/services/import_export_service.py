@@ -1,24 +1,695 @@
 """
 Import/Export service for bulk data operations.
+
+Bulk inserts here are Core executemany INSERTs; how the driver batches them is
+configured on the engine in app/config/database.py (insertmanyvalues_page_size).
 """
+import asyncio
+import importlib.util
 import logging
+import re
+import secrets
 import uuid
-from typing import Optional, List, Dict, Any, Tuple
-from datetime import datetime, date
-from io import BytesIO, StringIO
+import zipfile
+from collections import defaultdict
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Iterable, AsyncIterator, Callable, Coroutine, Sequence
+from datetime import datetime, date, time
+from io import BytesIO, TextIOWrapper
+from itertools import count, islice
 import csv
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, inspect, func, cast, and_, or_, String
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.config.database import AsyncSessionLocal
 from app.models.student import Student, StudentStatus
 from app.models.staff import Staff
 from app.models.fee import FeePayment, FeeType, PaymentStatus, FeeStructure
 from app.models.academic import SchoolClass
-from app.models.staff import Staff, StaffStatus, StaffType, Gender
+from app.models.attendance import Attendance
+from app.models.staff import Staff, StaffStatus, StaffType, Gender, staff_classes
 from app.models.timetable import TimetableEntry, TimeSlot, Room, DayOfWeek, TimetableStatus, TimetableConflict
 
 logger = logging.getLogger(__name__)
 
+# Probed once per process; the service itself is constructed per request
+_HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+
+if not _HAS_OPENPYXL:
+    logger.warning("openpyxl not installed. Excel import/export will be disabled.")
+
+# Fee amounts are stored with two-decimal precision; format them server-side.
+AMOUNT_FORMAT = "FM999999999990.00"
+
+# Import value maps, built once rather than per row.
+GENDER_BY_INITIAL = {"m": "male", "f": "female", "o": "other"}
+FEE_TYPE_MAP = {fee_type.value: fee_type for fee_type in FeeType}
+VALID_FEE_TYPES = ", ".join(FEE_TYPE_MAP)  # listed in invalid fee_type errors
+STAFF_TYPE_MAP = {staff_type.value: staff_type for staff_type in StaffType}
+STAFF_GENDER_MAP = {gender.value: gender for gender in Gender}
+# Timetable days by lowercase name ("monday") or ISO number ("1" = Monday).
+DAY_OF_WEEK_MAP = {day.name.lower(): day for day in DayOfWeek} | {str(day.value): day for day in DayOfWeek}
+
+# Accepted import dates: YYYY-MM-DD, YYYY/MM/DD, DD-MM-YYYY and DD/MM/YYYY.
+DATE_PATTERN = re.compile(r"(\d{4})([-/])(\d{1,2})\2(\d{1,2})|(\d{1,2})([-/])(\d{1,2})\6(\d{4})")
+
+
+def _is_iso_date_text(value: str) -> bool:
+    """
+    True for YYYY-MM-DD shaped text, the only form handed to date.fromisoformat
+    (which on 3.11 also accepts ISO week dates such as "2024-W01-1").
+    """
+    return len(value) == 10 and value[4] == "-" and value[7] == "-"
+
+
+def _parse_date(date_str: str) -> Optional[date]:
+    """Parse date from various formats (classified by DATE_PATTERN, no strptime retries)."""
+    if not date_str:
+        return None
+    date_str = date_str.strip()
+    # Fast path for the template's YYYY-MM-DD (C-implemented, no regex)
+    if _is_iso_date_text(date_str):
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            pass
+    match = DATE_PATTERN.fullmatch(date_str)
+    if not match:
+        return None
+    if match.group(1):
+        year, month, day = match.group(1, 3, 4)
+    else:
+        day, month, year = match.group(5, 7, 8)
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _parse_hhmm(value: Optional[str]) -> time:
+    """
+    Parse an HH:MM time without strptime. Raises ValueError when missing or malformed,
+    or OverflowError when a part is too large for time().
+    """
+    hours, sep, minutes = (value or "").partition(":")
+    if not sep:
+        raise ValueError(f"Invalid time: {value!r}")
+    return time(int(hours), int(minutes))
+
+
+def _class_name_splits(class_name: str) -> Iterator[Tuple[str, str]]:
+    """
+    Candidate (name, section) splits of a composite class name, in the order they
+    are tried: at the first '-', then before the last whitespace-separated token.
+
+    >>> list(_class_name_splits("Grade 10-A"))
+    [('Grade 10', 'A'), ('Grade', '10-A')]
+    >>> list(_class_name_splits("KG-1 A"))
+    [('KG', '1 A'), ('KG-1', 'A')]
+    >>> list(_class_name_splits("10 A"))
+    [('10', 'A')]
+    """
+    if '-' in class_name:
+        name, _, section = class_name.partition('-')
+        yield name.strip(), section.strip()
+    parts = class_name.split()
+    if len(parts) >= 2:
+        yield " ".join(parts[:-1]), parts[-1]
+
+
+def _parse_gender(value: Optional[str]) -> Optional[str]:
+    """Map m/male, f/female, o/other (any case) to the gender value, dispatching on the first letter."""
+    if not value:
+        return None
+    value = value.strip()
+    gender = GENDER_BY_INITIAL.get(value[:1].lower())
+    if gender and (len(value) == 1 or (len(value) == len(gender) and value.lower() == gender)):
+        return gender
+    return None
+
+
+def _get_str(row: Dict[str, Any], key: str) -> Optional[str]:
+    """Get stripped string value from a row or None (blank counts as missing)."""
+    val = row.get(key)
+    if not val:
+        return None
+    return val.strip() or None
+
+
+def _to_int(value: str) -> Optional[int]:
+    """Parse an integer (tolerating "3.0") or return None."""
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+# Student import columns: (Student attribute, row keys tried in order, parser).
+STUDENT_IMPORT_FIELDS = (
+    # Required fields
+    ("first_name", ("first_name",), None),
+    ("last_name", ("last_name",), None),
+    ("admission_number", ("admission_number",), None),
+    
+    # Personal details
+    ("middle_name", ("middle_name",), None),
+    ("date_of_birth", ("date_of_birth",), _parse_date),
+    ("blood_group", ("blood_group",), None),
+    ("nationality", ("nationality",), None),
+    ("religion", ("religion",), None),
+    ("caste", ("caste",), None),
+    ("category", ("category",), None),
+    
+    # Contact
+    ("email", ("email",), None),
+    ("phone", ("phone",), None),
+    ("alternate_phone", ("alternate_phone",), None),
+    
+    # Address
+    ("address_line1", ("address_line1",), None),
+    ("address_line2", ("address_line2",), None),
+    ("city", ("city",), None),
+    ("state", ("state",), None),
+    ("pincode", ("pincode", "postal_code"), None),
+    ("country", ("country",), None),
+    
+    # Parent/Guardian details
+    ("father_name", ("father_name",), None),
+    ("father_phone", ("father_phone",), None),
+    ("father_occupation", ("father_occupation",), None),
+    ("mother_name", ("mother_name",), None),
+    ("mother_phone", ("mother_phone",), None),
+    ("mother_occupation", ("mother_occupation",), None),
+    ("guardian_name", ("guardian_name",), None),
+    ("guardian_phone", ("guardian_phone",), None),
+    ("guardian_relation", ("guardian_relation",), None),
+    ("parent_email", ("parent_email", "guardian_email"), None),
+    
+    # Academic
+    ("roll_number", ("roll_number",), None),
+    ("course", ("course",), None),
+    ("department", ("department",), None),
+    ("batch", ("batch",), None),
+    ("section", ("section",), None),
+    ("semester", ("semester",), _to_int),
+    ("year", ("year",), _to_int),
+    ("admission_date", ("admission_date",), _parse_date),
+    ("admission_type", ("admission_type",), None),
+)
+
+
+# Columns set on new students; the remaining columns use their table defaults.
+STUDENT_INSERT_COLUMNS = ("id", "tenant_id", "gender", "class_id", "status", "is_deleted") + tuple(
+    attr for attr, _, _ in STUDENT_IMPORT_FIELDS
+)
+
+# FeePayment columns set by _create_fee_for_student, in Core bulk-insert parameter order.
+FEE_INSERT_COLUMNS = (
+    "id", "tenant_id", "transaction_id", "student_id", "fee_type", "description",
+    "academic_year", "total_amount", "paid_amount", "due_date", "status",
+)
+
+
+def _is_better_admission_match(candidate: Student, current: Student) -> bool:
+    """
+    Rank case-insensitive admission matches: a non-deleted student first, then the most
+    recently updated one, with the id as a final tie-break so the choice never depends
+    on the order Postgres returns rows in.
+    """
+    if candidate.is_deleted != current.is_deleted:
+        return not candidate.is_deleted
+    return (candidate.updated_at, str(candidate.id)) > (current.updated_at, str(current.id))
+
+
+def _read_student_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Read every STUDENT_IMPORT_FIELDS column from a row; missing or unparsable values are None."""
+    values = {}
+    for attr, keys, parse in STUDENT_IMPORT_FIELDS:
+        value = None
+        for key in keys:
+            value = _get_str(row, key)
+            if value is not None:
+                break
+        if value is not None and parse is not None:
+            value = parse(value)
+        values[attr] = value
+    return values
+
+
+def _excel_cell_text(value: Any) -> str:
+    """Text for one non-empty spreadsheet cell; whole-number floats lose their ".0"."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _normalize_header(header: Any) -> str:
+    """Canonical column key for every import path: "First Name " -> "first_name"; a blank header is ""."""
+    if header is None:
+        return ""
+    return str(header).strip().lower().replace(" ", "_")
+
+
+def _iter_excel_rows(file_content: bytes) -> Iterator[Dict[str, str]]:
+    """
+    Lazily read the first sheet of an .xlsx upload as dicts keyed by normalized header,
+    every cell as text ("" when empty); fully blank rows are skipped.
+    Uses openpyxl's read-only mode, which streams the sheet XML without loading
+    styles or building a DataFrame. The workbook is closed when the generator finishes
+    or is discarded.
+    """
+    from openpyxl import load_workbook
+    
+    workbook = load_workbook(BytesIO(file_content), read_only=True, data_only=True)
+    try:
+        sheet_rows = workbook.active.iter_rows(values_only=True)
+        headers = next(sheet_rows, None)
+        if headers is None:
+            return
+        headers = list(map(_normalize_header, headers))
+        for values in sheet_rows:
+            if any(value is not None for value in values):
+                yield {header: "" if value is None else _excel_cell_text(value) for header, value in zip(headers, values)}
+    finally:
+        workbook.close()
+
+
+def _read_excel_rows(file_content: bytes) -> List[Dict[str, str]]:
+    """All rows of _iter_excel_rows, for importers that need the whole sheet up front."""
+    return list(_iter_excel_rows(file_content))
+
+
+def _error_dicts(errors: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    """Expand internal (row, message) error tuples into the API's {"row", "error"} dicts."""
+    return [{"row": row, "error": message} for row, message in errors]
+
+
+def _text(value: Any) -> str:
+    """Export cell for a plain value; NULL becomes an empty cell."""
+    return "" if value is None else str(value)
+
+
+def _enum_text(value: Any) -> str:
+    """Export cell for an enum column; NULL becomes an empty cell."""
+    return value.value if value is not None else ""
+
+
+# Per-column formatters, in _fee_export_query column order.
+FEE_EXPORT_FORMATTERS = (
+    _text, _text, _enum_text,            # transaction_id, student_id, fee_type
+    _text, _text, _text,                 # total, paid, balance (already text)
+    _text, _text,                        # due_date, payment_date
+    _enum_text, _enum_text, _text,       # payment_method, status, notes
+)
+
+FEE_EXPORT_HEADERS = ["Transaction ID", "Student ID", "Fee Type", "Total Amount", "Paid Amount", "Balance", "Due Date", "Payment Date", "Payment Method", "Status", "Notes"]
+
+
+def _format_fee_rows(payments: Sequence[Any]) -> Iterable[Tuple[str, ...]]:
+    """
+    Format fee export rows for csv.writer.
+    Formatting runs column by column (one map per column) rather than cell by cell.
+    """
+    if not payments:
+        return ()
+    columns = zip(*payments)
+    formatted = [map(fmt, column) for fmt, column in zip(FEE_EXPORT_FORMATTERS, columns)]
+    return zip(*formatted)
+
+# Student export columns, matching the import template
+STUDENT_EXPORT_HEADERS = [
+    "id",
+    "admission_number",
+    "first_name",
+    "middle_name",
+    "last_name",
+    "date_of_birth",
+    "gender",
+    "blood_group",
+    "nationality",
+    "religion",
+    "caste",
+    "category",
+    "email",
+    "phone",
+    "alternate_phone",
+    "address_line1",
+    "address_line2",
+    "city",
+    "state",
+    "pincode",
+    "country",
+    "father_name",
+    "father_phone",
+    "father_occupation",
+    "mother_name",
+    "mother_phone",
+    "mother_occupation",
+    "guardian_name",
+    "guardian_phone",
+    "guardian_relation",
+    "parent_email",
+    "roll_number",
+    "class_id",
+    "course",
+    "department",
+    "batch",
+    "section",
+    "semester",
+    "year",
+    "admission_date",
+    "admission_type",
+    "status",
+    "created_at",
+]
+
+
+def _student_csv_row(student: Any) -> Tuple[str, ...]:
+    """
+    One student export row, in STUDENT_EXPORT_HEADERS order.
+    Kept as a single tuple expression (one frame per row) rather than a table of
+    per-column getters, which would add a call per cell.
+    """
+    return (
+        str(student.id),
+        student.admission_number or "",
+        student.first_name or "",
+        student.middle_name or "",
+        student.last_name or "",
+        student.date_of_birth.isoformat() if student.date_of_birth else "",
+        student.gender.value if student.gender else "",
+        student.blood_group or "",
+        student.nationality or "",
+        student.religion or "",
+        student.caste or "",
+        student.category or "",
+        student.email or "",
+        student.phone or "",
+        student.alternate_phone or "",
+        student.address_line1 or "",
+        student.address_line2 or "",
+        student.city or "",
+        student.state or "",
+        student.pincode or "",
+        student.country or "",
+        student.father_name or "",
+        student.father_phone or "",
+        student.father_occupation or "",
+        student.mother_name or "",
+        student.mother_phone or "",
+        student.mother_occupation or "",
+        student.guardian_name or "",
+        student.guardian_phone or "",
+        student.guardian_relation or "",
+        student.parent_email or "",
+        student.roll_number or "",
+        str(student.class_id) if student.class_id else "",
+        student.course or "",
+        student.department or "",
+        student.batch or "",
+        student.section or "",
+        str(student.semester) if student.semester else "",
+        str(student.year) if student.year else "",
+        student.admission_date.isoformat() if student.admission_date else "",
+        student.admission_type or "",
+        student.status.value if student.status else "",
+        student.created_at.isoformat(sep=" ", timespec="seconds") if student.created_at else "",
+    )
+
+
+def _attendance_csv_row(r: Any) -> Tuple[str, ...]:
+    """One attendance export row: date, student, status, remarks, recorded by."""
+    status = r.status
+    return (
+        str(r.attendance_date),
+        str(r.student_id) if r.student_id else "",
+        status.value if hasattr(status, 'value') else str(status),
+        r.remarks or "",
+        str(r.marked_by) if r.marked_by else "",
+    )
+
+
+def _staff_full_name():
+    """SQL form of Staff.full_name (middle name only when present); NULL when there is no staff row."""
+    return func.nullif(func.concat_ws(" ", Staff.first_name, Staff.middle_name, Staff.last_name), "")
+
+
+def _staff_csv_row(s: Any) -> Tuple[str, ...]:
+    """One staff export row (see stream_staff_csv); classes arrive pre-joined as "Name-Section" pairs."""
+    return (
+        s.first_name,
+        s.last_name or "",
+        s.email or "",
+        s.phone or "",
+        s.employee_id,
+        s.staff_type.value if s.staff_type else "",
+        s.designation or "",
+        s.department or "",
+        s.qualification or "",
+        s.joining_date.isoformat() if s.joining_date else "",
+        s.gender.value if s.gender else "",
+        s.date_of_birth.isoformat() if s.date_of_birth else "",
+        s.address or "",
+        s.city or "",
+        s.state or "",
+        s.classes or "",
+        s.status.value
+    )
+
+
+# Pending ORM inserts are flushed in batches of this size during imports.
+IMPORT_FLUSH_BATCH_SIZE = 500
+
+# Sharded exports open one pooled session per shard; stay below the pool size.
+EXPORT_SHARD_CONCURRENCY = 4
+
+# Rows fetched per server-side cursor round trip (and per yielded CSV chunk) in streamed exports
+EXPORT_STREAM_BATCH_SIZE = 1000
+
+# Bytes of COPY output gathered into each chunk of a COPY-backed export stream
+EXPORT_COPY_CHUNK_BYTES = 64 * 1024
+
+
+async def _batches_in_thread(reader: Iterable[Dict[str, Any]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield lists of up to IMPORT_FLUSH_BATCH_SIZE rows from reader. Parsing runs in a
+    worker thread, one batch ahead of the rows being processed, so the event loop is
+    free while the next batch is decoded.
+    """
+    rows = iter(reader)
+    
+    def read_batch() -> List[Dict[str, Any]]:
+        return list(islice(rows, IMPORT_FLUSH_BATCH_SIZE))
+    
+    next_batch = asyncio.create_task(asyncio.to_thread(read_batch))
+    try:
+        while batch := await next_batch:
+            # Only one read is ever in flight, so the reader is never shared between threads
+            next_batch = asyncio.create_task(asyncio.to_thread(read_batch))
+            yield batch
+    finally:
+        next_batch.cancel()
+
+
+async def _rows_in_thread(reader: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the rows of reader one by one, parsed in batches by _batches_in_thread."""
+    async for batch in _batches_in_thread(reader):
+        for row in batch:
+            yield row
+
+
+def _csv_dict_reader(file_content: bytes) -> csv.DictReader:
+    """DictReader over the uploaded bytes with normalized headers; lines are decoded as they are read."""
+    reader = csv.DictReader(TextIOWrapper(BytesIO(file_content), encoding='utf-8', newline=''))
+    if reader.fieldnames:
+        reader.fieldnames = list(map(_normalize_header, reader.fieldnames))
+    return reader
+
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field the way csv.writer does (QUOTE_MINIMAL)."""
+    # Chained substring tests: each is one C-level scan, with no generator frame per field
+    if ',' in value or '"' in value or '\r' in value or '\n' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _csv_line(fields: Iterable[str]) -> str:
+    """One CSV record, byte-for-byte what csv.writer.writerow emits for a multi-field row of strings."""
+    return ",".join(map(_csv_field, fields)) + "\r\n"
+
+
+def _template_csv(headers: List[str], sample: List[str]) -> bytes:
+    """Render an import template (header row + sample row) as CSV bytes by joining fields directly."""
+    return (_csv_line(headers) + _csv_line(sample)).encode('utf-8')
+
+
+def _build_student_import_template() -> bytes:
+    """
+    Generate a CSV template for student import.
+    Includes all student fields, class linking, and fee assignment.
+    """
+    headers = [
+        # Required fields
+        "first_name",
+        "last_name",
+        "admission_number",
+        
+        # Personal details
+        "middle_name",
+        "date_of_birth",
+        "gender",
+        "blood_group",
+        "nationality",
+        "religion",
+        "caste",
+        "category",
+        
+        # Contact
+        "email",
+        "phone",
+        "alternate_phone",
+        
+        # Address
+        "address_line1",
+        "address_line2",
+        "city",
+        "state",
+        "pincode",
+        "country",
+        
+        # Parent/Guardian details
+        "father_name",
+        "father_phone",
+        "father_occupation",
+        "mother_name",
+        "mother_phone",
+        "mother_occupation",
+        "guardian_name",
+        "guardian_phone",
+        "guardian_relation",
+        "parent_email",
+        
+        # Academic
+        "roll_number",
+        "class_name",
+        "section",
+        "course",
+        "department",
+        "batch",
+        "semester",
+        "year",
+        "admission_date",
+        "admission_type",
+        
+        # Fee-related fields (optional)
+        "fee_structure",
+        "fee_type",
+        "fee_amount",
+        "academic_year",
+        "fee_due_date",
+    ]
+    
+    # Sample data row
+    sample = [
+        # Required
+        "John",
+        "Doe",
+        "ADM-2024-001",
+        
+        # Personal
+        "William",
+        "2010-05-15",
+        "male",
+        "O+",
+        "Indian",
+        "",
+        "",
+        "General",
+        
+        # Contact
+        "john.doe@example.com",
+        "+919876543210",
+        "",
+        
+        # Address
+        "123 Main Street",
+        "Apt 4B",
+        "Mumbai",
+        "Maharashtra",
+        "400001",
+        "India",
+        
+        # Parent/Guardian
+        "Robert Doe",
+        "+919876543211",
+        "Engineer",
+        "Mary Doe",
+        "+919876543212",
+        "Doctor",
+        "James Doe",
+        "+919876543213",
+        "Uncle",
+        "parent@example.com",
+        
+        # Academic
+        "101",
+        "10",
+        "A",
+        "Science",
+        "Physics",
+        "2024-2028",
+        "1",
+        "1",
+        "2024-04-01",
+        "Regular",
+        
+        # Fee
+        "Annual Tuition Fee",
+        "tuition",
+        "50000",
+        "2024-25",
+        "2024-06-30",
+    ]
+    
+    return _template_csv(headers, sample)
+
+
+# Static content, so it is rendered once at import time.
+STUDENT_IMPORT_TEMPLATE_CSV = _build_student_import_template()
+
+# Fixed import templates, rendered once at import time
+STAFF_IMPORT_TEMPLATE_CSV = _template_csv(
+    [
+        "first_name", "last_name", "email", "phone", "employee_id", 
+        "staff_type", "designation", "department", "qualification", 
+        "joining_date", "gender", "date_of_birth", "address", "city", "state",
+        "classes" # Comma separated Class Name-Section (e.g. "10-A, 9-B")
+    ],
+    [
+        "John", "Smith", "john.smith@school.com", "+919876543210", "EMP001",
+        "teaching", "Senior Teacher", "Science", "M.Sc. Physics",
+        "2023-06-01", "male", "1985-05-15", "123 Teacher Colony", "Mumbai", "Maharashtra",
+        "10-A, 9-B"
+    ],
+)
+
+TIMETABLE_IMPORT_TEMPLATE_CSV = _template_csv(
+    [
+        "day", "start_time", "end_time", "class", "section", 
+        "subject", "teacher_email_or_id", "room", "slot_type"
+    ],
+    [
+        "Monday", "09:00", "10:00", "10", "A", 
+        "Mathematics", "john.smith@school.com", "Room 101", "class"
+    ],
+)
+
+CLASSES_IMPORT_TEMPLATE_CSV = _template_csv(
+    ["name", "section", "capacity", "class_teacher_email"],
+    ["10", "A", "40", "teacher@example.com"],
+)
+
 
 class ImportExportService:
     """
@@ -27,157 +698,17 @@ class ImportExportService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.has_pandas = False
-        self.has_openpyxl = False
-        
-        try:
-            import pandas as pd
-            self.has_pandas = True
-        except ImportError:
-            logger.warning("pandas not installed. Excel support will be limited.")
-        
-        try:
-            import openpyxl
-            self.has_openpyxl = True
-        except ImportError:
-            logger.warning("openpyxl not installed. Excel export will be disabled.")
+        self.has_openpyxl = _HAS_OPENPYXL
+        self._batch_write: Optional[asyncio.Task] = None
     
     # ============== Student Import ==============
     
     def get_student_import_template(self) -> bytes:
         """
-        Generate a CSV template for student import.
+        CSV template for student import.
         Includes all student fields, class linking, and fee assignment.
         """
-        headers = [
-            # Required fields
-            "first_name",
-            "last_name",
-            "admission_number",
-            
-            # Personal details
-            "middle_name",
-            "date_of_birth",
-            "gender",
-            "blood_group",
-            "nationality",
-            "religion",
-            "caste",
-            "category",
-            
-            # Contact
-            "email",
-            "phone",
-            "alternate_phone",
-            
-            # Address
-            "address_line1",
-            "address_line2",
-            "city",
-            "state",
-            "pincode",
-            "country",
-            
-            # Parent/Guardian details
-            "father_name",
-            "father_phone",
-            "father_occupation",
-            "mother_name",
-            "mother_phone",
-            "mother_occupation",
-            "guardian_name",
-            "guardian_phone",
-            "guardian_relation",
-            "parent_email",
-            
-            # Academic
-            "roll_number",
-            "class_name",
-            "section",
-            "course",
-            "department",
-            "batch",
-            "semester",
-            "year",
-            "admission_date",
-            "admission_type",
-            
-            # Fee-related fields (optional)
-            "fee_structure",
-            "fee_type",
-            "fee_amount",
-            "academic_year",
-            "fee_due_date",
-        ]
-        
-        # Sample data row
-        sample = [
-            # Required
-            "John",
-            "Doe",
-            "ADM-2024-001",
-            
-            # Personal
-            "William",
-            "2010-05-15",
-            "male",
-            "O+",
-            "Indian",
-            "",
-            "",
-            "General",
-            
-            # Contact
-            "john.doe@example.com",
-            "+919876543210",
-            "",
-            
-            # Address
-            "123 Main Street",
-            "Apt 4B",
-            "Mumbai",
-            "Maharashtra",
-            "400001",
-            "India",
-            
-            # Parent/Guardian
-            "Robert Doe",
-            "+919876543211",
-            "Engineer",
-            "Mary Doe",
-            "+919876543212",
-            "Doctor",
-            "James Doe",
-            "+919876543213",
-            "Uncle",
-            "parent@example.com",
-            
-            # Academic
-            "101",
-            "10",
-            "A",
-            "Science",
-            "Physics",
-            "2024-2028",
-            "1",
-            "1",
-            "2024-04-01",
-            "Regular",
-            
-            # Fee
-            "Annual Tuition Fee",
-            "tuition",
-            "50000",
-            "2024-25",
-            "2024-06-30",
-        ]
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerow(sample)
-        
-        return output.getvalue().encode('utf-8')
+        return STUDENT_IMPORT_TEMPLATE_CSV
     
     async def import_students_from_csv(
         self,
@@ -204,105 +735,68 @@ class ImportExportService:
         }
         
         try:
-            # Pre-load all classes for this tenant for efficient lookup
-            class_result = await self.db.execute(
-                select(SchoolClass).where(
-                    SchoolClass.tenant_id == tenant_id,
-                    SchoolClass.is_deleted == False
-                )
-            )
-            classes = list(class_result.scalars().all())
-
-            # Pre-load all fee structures for this tenant
-            structure_result = await self.db.execute(
+            # Pre-load all classes and fee structures for this tenant (independent, so concurrently)
+            classes, fee_structures = await self._load_concurrently(
+                self._class_lookup_query(tenant_id),
                 select(FeeStructure).where(
                     FeeStructure.tenant_id == tenant_id,
                     FeeStructure.is_active == True
-                )
+                ),
             )
-            fee_structures = list(structure_result.scalars().all())
+            self._index_classes(classes)
             
-            # Decode and parse CSV
-            content = file_content.decode('utf-8')
-            
-            # Read first line to get headers and normalize them
-            io_obj = StringIO(content)
-            csv_reader = csv.reader(io_obj)
-            try:
-                headers = next(csv_reader)
-                normalized_headers = [h.strip().lower().replace(' ', '_') for h in headers]
-            except StopIteration:
-                results["errors"].append({"row": 1, "error": "File is empty"})
+            # Stream the CSV straight from the uploaded bytes (no decoded copy, no row list)
+            reader = self._stream_csv_rows(file_content)
+            if reader is None:
+                results["errors"].append((1, "File is empty"))
                 return results
-
-            # Use DictReader with normalized fieldnames
-            io_obj.seek(0)
-            next(io_obj)  # Skip original header
-            reader = csv.DictReader(io_obj, fieldnames=normalized_headers)
-            rows = list(reader)
-            results["total_rows"] = len(rows)
+            self._reset_import_lookups()
             
             # Track if we have critical errors that should trigger rollback
             critical_error_count = 0
             max_critical_errors = 5  # Rollback if more than 5 critical errors
             
-            for row_num, row in enumerate(rows, start=2):  # Start at 2 (row 1 is headers)
+            # Generated admission numbers share one date prefix per import
+            admission_prefix = f"ADM-{datetime.now().strftime('%Y%m%d')}-"
+            
+            row_num = 1  # Row 1 is headers
+            async for row in self._iter_rows_with_lookups(tenant_id, reader):
+                row_num += 1
+                results["total_rows"] += 1
+                # Send pending inserts in batches rather than one flush per student
+                if len(self._pending_students) + len(self._pending_fees) >= IMPORT_FLUSH_BATCH_SIZE:
+                    await self._flush_import_batch()
                 try:
                     # Validate required fields
                     if not row.get("first_name"):
-                        results["errors"].append({
-                            "row": row_num,
-                            "error": "first_name is required"
-                        })
+                        results["errors"].append((row_num, "first_name is required"))
                         critical_error_count += 1
                         continue
                     
                     if not row.get("last_name"):
-                        results["errors"].append({
-                            "row": row_num,
-                            "error": "last_name is required"
-                        })
+                        results["errors"].append((row_num, "last_name is required"))
                         critical_error_count += 1
                         continue
                     
                     # Look up class_id (optional - don't fail if not found)
                     class_id = None
                     if row.get("class_name"):
-                        class_id, class_error = self._resolve_class_id(classes, row)
+                        class_id, class_error = self._resolve_class_id(row)
                         if class_error:
-                            results["errors"].append({
-                                "row": row_num,
-                                "error": class_error + " (student will be created without class link)"
-                            })
+                            results["errors"].append((row_num, class_error + " (student will be created without class link)"))
                             # Don't skip - just create without class link
                     
                     # Check for duplicates by admission_number or email (excluding deleted)
-                    existing = None
-                    if row.get("admission_number"):
-                        existing_result = await self.db.execute(
-                            select(Student).where(
-                                Student.tenant_id == tenant_id,
-                                Student.admission_number == row["admission_number"],
-                            ).order_by(Student.is_deleted.asc(), Student.updated_at.desc())
-                        )
-                        existing = existing_result.scalars().first()
-                    
-                    if not existing and row.get("email"):
-                        existing_result = await self.db.execute(
-                            select(Student).where(
-                                Student.tenant_id == tenant_id,
-                                Student.email == row["email"],
-                                Student.is_deleted == False,  # Only check non-deleted
-                            )
-                        )
-                        existing = existing_result.scalars().first()
+                    existing = self._find_existing_student(row)
                     
                     if existing:
                         # Handle soft-deleted students - Reactivate and Update
                         if existing.is_deleted:
+                            self._attach(existing)
                             existing.is_deleted = False
                             existing.status = StudentStatus.ACTIVE
                             await self._update_student_from_row(existing, row, class_id)
+                            self._remember_student(existing)
                             # Create fees (both structure based and manual)
                             fee_created_count = await self._apply_fees(tenant_id, existing, row, row_num, results, fee_structures)
                             if fee_created_count > 0:
@@ -324,20 +818,16 @@ class ImportExportService:
                         elif skip_duplicates:
                             results["skipped"] += 1
                         else:
-                            results["errors"].append({
-                                "row": row_num,
-                                "error": f"Duplicate student: {row.get('admission_number') or row.get('email')}"
-                            })
+                            results["errors"].append((row_num, f"Duplicate student: {row.get('admission_number') or row.get('email')}"))
                         continue
                     
                     # Generate admission number if not provided
                     if not row.get("admission_number"):
-                        row["admission_number"] = f"ADM-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+                        row["admission_number"] = admission_prefix + secrets.token_hex(3).upper()
                     
                     # Create new student with class_id
                     student = self._create_student_from_row(tenant_id, row, class_id)
-                    self.db.add(student)
-                    await self.db.flush()  # Get student.id before creating fee
+                    self._queue_new_student(student)  # id is assigned client-side, so fees can reference it unflushed
                     
                     # Create fee payment if fee details provided
                     fee_created_count = await self._apply_fees(tenant_id, student, row, row_num, results, fee_structures)
@@ -348,46 +838,265 @@ class ImportExportService:
                     results["imported_ids"].append(str(student.id))
                     
                 except Exception as e:
-                    results["errors"].append({
-                        "row": row_num,
-                        "error": str(e)
-                    })
+                    results["errors"].append((row_num, str(e)))
                     critical_error_count += 1
             
             # Check if too many errors - rollback
             if critical_error_count > max_critical_errors and results["imported"] == 0:
                 await self.db.rollback()
-                results["errors"].insert(0, {
-                    "row": 0,
-                    "error": f"Import aborted: Too many errors ({critical_error_count}). No data was saved."
-                })
+                results["errors"].insert(0, (0, f"Import aborted: Too many errors ({critical_error_count}). No data was saved."))
                 results["imported"] = 0
                 results["updated"] = 0
                 results["fees_created"] = 0
                 results["imported_ids"] = []
                 return results
             
+            await self._flush_import_batch()
             await self.db.commit()
             
         except Exception as e:
             # Rollback on any unhandled exception
             await self.db.rollback()
             logger.error(f"Failed to import students: {str(e)}")
-            results["errors"].append({"row": 0, "error": f"Import failed and rolled back: {str(e)}"})
+            results["errors"].append((0, f"Import failed and rolled back: {str(e)}"))
             # Reset counts since we rolled back
             results["imported"] = 0
             results["updated"] = 0
             results["fees_created"] = 0
             results["imported_ids"] = []
+        finally:
+            results["errors"] = _error_dicts(results["errors"])
         
         return results
     
-    def _resolve_class_id(self, classes: List[SchoolClass], row: Dict[str, Any]) -> Tuple[Optional[Any], Optional[str]]:
+    def _stream_csv_rows(self, file_content: bytes) -> Optional[Iterator[Dict[str, str]]]:
+        """
+        Lazily parse CSV bytes into dicts keyed by normalized header names.
+        Returns None if the file has no header row.
+        """
+        # BytesIO shares the bytes object's buffer, so only one line is decoded at a time
+        text_stream = TextIOWrapper(BytesIO(file_content), encoding='utf-8', newline='')
+        
+        # Read first line to get headers and normalize them; the same reader then
+        # continues with the records, so the header is parsed once
+        reader = csv.reader(text_stream)
+        try:
+            headers = next(reader)
+        except StopIteration:
+            return None
+        normalized_headers = list(map(_normalize_header, headers))
+        
+        # Zip each record onto the normalized headers (what DictReader does, minus its
+        # per-row Python bookkeeping); blank lines are skipped like DictReader does.
+        return (dict(zip(normalized_headers, values)) for values in reader if values)
+    
+    def _reset_import_lookups(self) -> None:
+        """Start empty duplicate-student and existing-fee lookups (and a fresh transaction ID sequence) for a new import."""
+        self._students_by_admission: Dict[str, Student] = {}
+        self._live_students_by_exact_admission: Dict[str, Student] = {}
+        self._students_by_email: Dict[str, Student] = {}
+        self._students_by_id: Dict[Any, Student] = {}
+        self._fees_by_key: Dict[Tuple[Any, FeeType, Optional[str]], FeePayment] = {}
+        self._pending_students: List[Student] = []
+        self._pending_fees: List[FeePayment] = []
+        # Imported fee transaction IDs: one random prefix per import plus a counter
+        self._transaction_prefix = f"IMP-{secrets.token_hex(4).upper()}-"
+        self._transaction_seq = count(1)
+    
+    def _queue_new_student(self, student: Student) -> None:
+        """Hold a new student for the next Core bulk INSERT and make it visible to later rows."""
+        self._pending_students.append(student)
+        self._remember_student(student)
+    
+    async def _flush_import_batch(self) -> None:
+        """
+        Insert queued students, then their queued fees, with one Core executemany
+        INSERT each (bypassing the ORM unit of work), then flush pending updates.
+        The session is then emptied, so its identity map stays one batch deep however
+        long the file is; the lookups keep inserted/loaded objects as detached instances,
+        which _attach() puts back into the session when a later row changes them.
+        """
+        if self._pending_students:
+            await self.db.execute(
+                insert(Student),
+                [{attr: getattr(student, attr) for attr in STUDENT_INSERT_COLUMNS} for student in self._pending_students],
+            )
+            for student in self._pending_students:
+                make_transient_to_detached(student)
+            self._pending_students = []
+        if self._pending_fees:
+            await self.db.execute(
+                insert(FeePayment),
+                [{attr: getattr(fee, attr) for attr in FEE_INSERT_COLUMNS} for fee in self._pending_fees],
+            )
+            for fee in self._pending_fees:
+                make_transient_to_detached(fee)
+            self._pending_fees = []
+        await self.db.flush()
+        self.db.expunge_all()
+    
+    def _attach(self, obj: Any) -> None:
+        """Re-add a lookup object expunged by an earlier batch before changing it, so the change is flushed."""
+        if inspect(obj).detached:
+            self.db.add(obj)
+    
+    async def _iter_rows_with_lookups(
+        self, tenant_id: str, reader: Iterator[Dict[str, Any]], match_email: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield rows from reader, pre-loading duplicate students and their fees
+        for each batch of IMPORT_FLUSH_BATCH_SIZE rows before it is processed.
+        Batches are parsed in a worker thread (see _batches_in_thread).
+        match_email=False only pre-loads admission-number matches.
+        """
+        async for batch in _batches_in_thread(reader):
+            found = await self._index_existing_students(
+                tenant_id,
+                admission_numbers={r["admission_number"] for r in batch if r.get("admission_number")},
+                emails={r["email"] for r in batch if r.get("email")} if match_email else set(),
+            )
+            await self._index_existing_fees(tenant_id, found)
+            for row in batch:
+                yield row
+    
+    async def _index_existing_students(self, tenant_id: str, admission_numbers: set, emails: set) -> List[Student]:
+        """
+        Load students matching the given admission numbers or emails in one query.
+        Matching is case-insensitive (served by the lower() indexes on students).
+        Admission matches prefer non-deleted, most recently updated students;
+        email matches only consider non-deleted students.
+        Keys already indexed are skipped. Returns the newly indexed students.
+        """
+        admission_numbers = {a.lower() for a in admission_numbers} - self._students_by_admission.keys()
+        emails = {e.lower() for e in emails} - self._students_by_email.keys()
+        if not admission_numbers and not emails:
+            return []
+        
+        result = await self.db.execute(
+            select(Student).where(
+                Student.tenant_id == tenant_id,
+                or_(
+                    func.lower(Student.admission_number).in_(list(admission_numbers)),
+                    func.lower(Student.email).in_(list(emails)),
+                ),
+            )
+        )
+        found = []
+        for student in result.scalars():
+            known = self._students_by_id.get(student.id)
+            if known is None:
+                self._students_by_id[student.id] = student
+                found.append(student)
+            elif known is not student:
+                # Indexed by an earlier batch (and since expunged) under another key;
+                # keep the single instance the lookups already share.
+                self.db.expunge(student)
+                student = known
+            admission_key = student.admission_number.lower()
+            if admission_key in admission_numbers:
+                # The live-admission unique index is case-sensitive, so "adm-1" and "ADM-1"
+                # can both be live. An exact-case live match wins in _find_existing_student;
+                # otherwise the ranked case-insensitive match is used.
+                if not student.is_deleted:
+                    self._live_students_by_exact_admission[student.admission_number] = student
+                current = self._students_by_admission.get(admission_key)
+                if current is None or _is_better_admission_match(student, current):
+                    self._students_by_admission[admission_key] = student
+            email_key = student.email.lower() if student.email else None
+            if email_key in emails and not student.is_deleted:
+                self._students_by_email.setdefault(email_key, student)
+        return found
+    
+    async def _index_existing_fees(self, tenant_id: str, students: List[Student]) -> None:
+        """
+        Load fees of the given students in one query,
+        keyed by (student_id, fee_type, academic_year) for _create_fee_for_student.
+        """
+        if not students:
+            return
+        
+        result = await self.db.execute(
+            select(FeePayment).where(
+                FeePayment.tenant_id == tenant_id,
+                FeePayment.student_id.in_([s.id for s in students]),
+            )
+        )
+        for fee in result.scalars():
+            if self._fees_by_key.setdefault((fee.student_id, fee.fee_type, fee.academic_year), fee) is not fee:
+                self.db.expunge(fee)
+    
+    def _find_existing_student(self, row: Dict[str, Any], match_email: bool = True) -> Optional[Student]:
+        """
+        Look up a row's existing student by admission_number, then email (case-insensitive).
+        A live student with the exact admission number is preferred over other case variants.
+        """
+        existing = None
+        admission_number = row.get("admission_number")
+        if admission_number:
+            existing = (
+                self._live_students_by_exact_admission.get(admission_number)
+                or self._students_by_admission.get(admission_number.lower())
+            )
+        if not existing and match_email and row.get("email"):
+            existing = self._students_by_email.get(row["email"].lower())
+        return existing
+    
+    def _remember_student(self, student: Student) -> None:
+        """Register a student created or reactivated by this import so later rows see it."""
+        self._students_by_id[student.id] = student
+        if student.admission_number:
+            self._students_by_admission[student.admission_number.lower()] = student
+            if not student.is_deleted:
+                self._live_students_by_exact_admission[student.admission_number] = student
+        if student.email:
+            self._students_by_email.setdefault(student.email.lower(), student)
+    
+    async def _load_concurrently(self, *queries) -> List[List[Any]]:
+        """
+        Run independent read-only queries concurrently, each on its own pooled session
+        (one AsyncSession cannot run statements in parallel). Results are plain loaded
+        objects (or column rows, for multi-column selects) used for lookups only.
         """
-        Resolve class_id from row data.
+        async def load(query) -> List[Any]:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(query)
+                if len(query.column_descriptions) > 1:
+                    return list(result.all())
+                return list(result.scalars().all())
+        
+        return await asyncio.gather(*[load(query) for query in queries])
+    
+    @staticmethod
+    def _class_lookup_query(tenant_id: str):
+        """The tenant's live classes as (id, name, section) rows; no ORM instances are built."""
+        return select(SchoolClass.id, SchoolClass.name, SchoolClass.section).where(
+            SchoolClass.tenant_id == tenant_id,
+            SchoolClass.is_deleted == False
+        )
+    
+    def _index_classes(self, classes: List[Any]) -> None:
+        """
+        Build case-insensitive class lookups used by _resolve_class_id.
+        Called once per import, after the tenant's classes are loaded as
+        (id, name, section) rows; see _class_lookup_query.
+        """
+        self._classes = classes
+        self._class_by_ns: Dict[Tuple[str, str], Any] = {}
+        self._class_by_name: Dict[str, List[Any]] = defaultdict(list)
+        self._class_resolutions: Dict[Tuple[str, str], Tuple[Optional[Any], Optional[str]]] = {}
+        for cls in classes:
+            name = cls.name.strip().lower()
+            self._class_by_ns.setdefault((name, cls.section.strip().lower()), cls.id)
+            self._class_by_name[name].append(cls)
+    
+    def _resolve_class_id(self, row: Dict[str, Any]) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Resolve class_id from row data using the index built by _index_classes.
         Handles checking 'class_name'/'class' and 'section'.
         If section is missing, tries to find unique class with that name.
         Also handles composite names like "10-A" or "10 A".
+        Class/section values repeat across most rows of a file, so each distinct
+        pair is resolved once and the result reused.
         """
         # Get normalized values
         class_name = str(row.get("class_name", "")).strip() or str(row.get("class", "")).strip()
@@ -399,12 +1108,17 @@ class ImportExportService:
             
         section = str(row.get("section", "")).strip()
         
+        key = (class_name, section)
+        resolution = self._class_resolutions.get(key)
+        if resolution is None:
+            resolution = self._class_resolutions[key] = self._match_class(class_name, section)
+        return resolution
+    
+    def _match_class(self, class_name: str, section: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Match a stripped class name and optional section against the class index."""
         # Helper to match class
         def find_match(name: str, sect: str) -> Optional[Any]:
-            for cls in classes:
-                if cls.name.strip().lower() == name.lower() and cls.section.strip().lower() == sect.lower():
-                    return cls.id
-            return None
+            return self._class_by_ns.get((name.lower(), sect.lower()))
 
         # Case 1: Name and Section provided explicitly
         if section:
@@ -413,38 +1127,21 @@ class ImportExportService:
                 return class_id, None
             
             # List available classes for debugging
-            available = [f"'{c.name}'-'{c.section}'" for c in classes]
-            return None, f"Class '{class_name}' with Section '{section}' not found. Available: {available[:5]}..."
+            available = [f"'{c.name}'-'{c.section}'" for c in self._classes[:5]]
+            return None, f"Class '{class_name}' with Section '{section}' not found. Available: {available}..."
             
         # Case 2: Only Name provided
         # 2a. Try exact match on Name (assuming unique name or relying on auto-resolution)
-        candidates = [c for c in classes if c.name.strip().lower() == class_name.lower()]
+        candidates = self._class_by_name.get(class_name.lower(), [])
         if len(candidates) == 1:
             return candidates[0].id, None
         elif len(candidates) > 1:
             sections = ", ".join([c.section for c in candidates])
             return None, f"Ambiguous class '{class_name}'. Multiple sections found ({sections}). Please specify 'Section' column."
         
-        # 2b. Try parsing "Name-Section" or "Name Section"
-        # Common delimiters: '-', ' '
-        import re
-        # Try "10-A"
-        if '-' in class_name:
-            parts = class_name.split('-', 1)
-            name_part = parts[0].strip()
-            sect_part = parts[1].strip()
-            cid = find_match(name_part, sect_part)
-            if cid:
-                return cid, None
-        
-        # Try "10 A" (last token is section? or specific pattern?)
-        # Let's try splitting by space if it looks like "Number Letter" or "Word Letter"
-        parts = class_name.split()
-        if len(parts) >= 2:
-            # Assume last part is section
-            sect_part = parts[-1]
-            name_part = " ".join(parts[:-1])
-            cid = find_match(name_part, sect_part)
+        # 2b. Try parsing "Name-Section" or "Name Section" ("Grade 10-A", "KG-1 A")
+        for name, sect in _class_name_splits(class_name):
+            cid = find_match(name, sect)
             if cid:
                 return cid, None
                 
@@ -452,235 +1149,34 @@ class ImportExportService:
 
     def _create_student_from_row(self, tenant_id: str, row: Dict[str, str], class_id: Optional[Any] = None) -> Student:
         """Create a Student object from a CSV row with all available fields."""
-        
-        def parse_date(date_str: str) -> Optional[date]:
-            """Parse date from various formats."""
-            if not date_str:
-                return None
-            for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
-                try:
-                    return datetime.strptime(date_str.strip(), fmt).date()
-                except ValueError:
-                    continue
-            return None
-        
-        def get_str(key: str) -> Optional[str]:
-            """Get stripped string value or None."""
-            val = row.get(key, "")
-            return val.strip() if val and val.strip() else None
-        
-        def get_int(key: str) -> Optional[int]:
-            """Get integer value or None."""
-            val = get_str(key)
-            if val:
-                try:
-                    return int(float(val))
-                except ValueError:
-                    return None
-            return None
-        
-        # Map gender
-        gender = None
-        if row.get("gender"):
-            gender_map = {
-                "male": "male", "m": "male",
-                "female": "female", "f": "female",
-                "other": "other", "o": "other",
-            }
-            gender = gender_map.get(row["gender"].lower().strip())
+        values = _read_student_fields(row)
+        values["last_name"] = values["last_name"] or ""
+        values["nationality"] = values["nationality"] or "Indian"
+        values["country"] = values["country"] or "India"
         
         return Student(
+            id=uuid.uuid4(),
             tenant_id=tenant_id,
-            # Required fields
-            first_name=row["first_name"].strip(),
-            last_name=row.get("last_name", "").strip() or "",
-            admission_number=get_str("admission_number"),
-            
-            # Personal details
-            middle_name=get_str("middle_name"),
-            date_of_birth=parse_date(row.get("date_of_birth", "")),
-            gender=gender,
-            blood_group=get_str("blood_group"),
-            nationality=get_str("nationality") or "Indian",
-            religion=get_str("religion"),
-            caste=get_str("caste"),
-            category=get_str("category"),
-            
-            # Contact
-            email=get_str("email"),
-            phone=get_str("phone"),
-            alternate_phone=get_str("alternate_phone"),
-            
-            # Address
-            address_line1=get_str("address_line1"),
-            address_line2=get_str("address_line2"),
-            city=get_str("city"),
-            state=get_str("state"),
-            pincode=get_str("pincode") or get_str("postal_code"),  # Handle both
-            country=get_str("country") or "India",
-            
-            # Parent/Guardian details
-            father_name=get_str("father_name"),
-            father_phone=get_str("father_phone"),
-            father_occupation=get_str("father_occupation"),
-            mother_name=get_str("mother_name"),
-            mother_phone=get_str("mother_phone"),
-            mother_occupation=get_str("mother_occupation"),
-            guardian_name=get_str("guardian_name"),
-            guardian_phone=get_str("guardian_phone"),
-            guardian_relation=get_str("guardian_relation"),
-            parent_email=get_str("parent_email") or get_str("guardian_email"),
-            
-            # Academic
-            roll_number=get_str("roll_number"),
+            gender=_parse_gender(row.get("gender")),
             class_id=class_id,
-            course=get_str("course"),
-            department=get_str("department"),
-            batch=get_str("batch"),
-            section=get_str("section"),
-            semester=get_int("semester"),
-            year=get_int("year"),
-            admission_date=parse_date(row.get("admission_date", "")),
-            admission_type=get_str("admission_type"),
-            
             status=StudentStatus.ACTIVE,
+            is_deleted=False,
+            **values,
         )
     
     async def _update_student_from_row(self, student: Student, row: Dict[str, str], class_id: Optional[Any] = None):
         """Update a Student object from a CSV row with all available fields."""
-        
-        def parse_date(date_str: str) -> Optional[date]:
-            """Parse date from various formats."""
-            if not date_str:
-                return None
-            for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
-                try:
-                    return datetime.strptime(date_str.strip(), fmt).date()
-                except ValueError:
-                    continue
-            return None
-        
-        def get_str(key: str) -> Optional[str]:
-            """Get stripped string value or None."""
-            val = row.get(key, "")
-            return val.strip() if val and val.strip() else None
-        
-        def get_int(key: str) -> Optional[int]:
-            """Get integer value or None."""
-            val = get_str(key)
-            if val:
-                try:
-                    return int(float(val))
-                except ValueError:
-                    return None
-            return None
-        
-        # Map gender
-        gender = None
-        if row.get("gender"):
-            gender_map = {
-                "male": "male", "m": "male",
-                "female": "female", "f": "female",
-                "other": "other", "o": "other",
-            }
-            gender = gender_map.get(row["gender"].lower().strip())
-        
+        self._attach(student)
         # Update all non-empty fields
-        # Required
-        if get_str("first_name"):
-            student.first_name = get_str("first_name")
-        if get_str("last_name"):
-            student.last_name = get_str("last_name")
-        if get_str("admission_number"):
-            student.admission_number = get_str("admission_number")
+        for attr, value in _read_student_fields(row).items():
+            if value is not None:
+                setattr(student, attr, value)
         
-        # Personal
-        if get_str("middle_name"):
-            student.middle_name = get_str("middle_name")
-        if row.get("date_of_birth"):
-            dob = parse_date(row["date_of_birth"])
-            if dob:
-                student.date_of_birth = dob
+        gender = _parse_gender(row.get("gender"))
         if gender:
             student.gender = gender
-        if get_str("blood_group"):
-            student.blood_group = get_str("blood_group")
-        if get_str("nationality"):
-            student.nationality = get_str("nationality")
-        if get_str("religion"):
-            student.religion = get_str("religion")
-        if get_str("caste"):
-            student.caste = get_str("caste")
-        if get_str("category"):
-            student.category = get_str("category")
-        
-        # Contact
-        if get_str("email"):
-            student.email = get_str("email")
-        if get_str("phone"):
-            student.phone = get_str("phone")
-        if get_str("alternate_phone"):
-            student.alternate_phone = get_str("alternate_phone")
-        
-        # Address
-        if get_str("address_line1"):
-            student.address_line1 = get_str("address_line1")
-        if get_str("address_line2"):
-            student.address_line2 = get_str("address_line2")
-        if get_str("city"):
-            student.city = get_str("city")
-        if get_str("state"):
-            student.state = get_str("state")
-        if get_str("pincode") or get_str("postal_code"):
-            student.pincode = get_str("pincode") or get_str("postal_code")
-        if get_str("country"):
-            student.country = get_str("country")
-        
-        # Parent/Guardian
-        if get_str("father_name"):
-            student.father_name = get_str("father_name")
-        if get_str("father_phone"):
-            student.father_phone = get_str("father_phone")
-        if get_str("father_occupation"):
-            student.father_occupation = get_str("father_occupation")
-        if get_str("mother_name"):
-            student.mother_name = get_str("mother_name")
-        if get_str("mother_phone"):
-            student.mother_phone = get_str("mother_phone")
-        if get_str("mother_occupation"):
-            student.mother_occupation = get_str("mother_occupation")
-        if get_str("guardian_name"):
-            student.guardian_name = get_str("guardian_name")
-        if get_str("guardian_phone"):
-            student.guardian_phone = get_str("guardian_phone")
-        if get_str("guardian_relation"):
-            student.guardian_relation = get_str("guardian_relation")
-        if get_str("parent_email") or get_str("guardian_email"):
-            student.parent_email = get_str("parent_email") or get_str("guardian_email")
-        
-        # Academic
-        if get_str("roll_number"):
-            student.roll_number = get_str("roll_number")
         if class_id:
             student.class_id = class_id
-        if get_str("section"):
-            student.section = get_str("section")
-        if get_str("course"):
-            student.course = get_str("course")
-        if get_str("department"):
-            student.department = get_str("department")
-        if get_str("batch"):
-            student.batch = get_str("batch")
-        if get_int("semester"):
-            student.semester = get_int("semester")
-        if get_int("year"):
-            student.year = get_int("year")
-        if row.get("admission_date"):
-            adm_date = parse_date(row["admission_date"])
-            if adm_date:
-                student.admission_date = adm_date
-        if get_str("admission_type"):
-            student.admission_type = get_str("admission_type")
 
     async def _apply_fees(
         self,
@@ -724,15 +1220,9 @@ class ImportExportService:
                             created_count += 1
                             
                 except Exception as e:
-                    results["errors"].append({
-                        "row": row_num,
-                        "error": f"Error applying fee structure '{structure_name}': {str(e)}"
-                    })
+                    results["errors"].append((row_num, f"Error applying fee structure '{structure_name}': {str(e)}"))
             else:
-                results["errors"].append({
-                    "row": row_num,
-                    "error": f"Fee structure '{structure_name}' not found"
-                })
+                results["errors"].append((row_num, f"Fee structure '{structure_name}' not found"))
 
         # 2. Apply Manual Fee if provided (fee_type + fee_amount)
         if row.get("fee_type") and row.get("fee_amount"):
@@ -760,42 +1250,28 @@ class ImportExportService:
         
         try:
             # Map fee type string to enum
-            fee_type_map = {
-                "tuition": FeeType.TUITION,
-                "admission": FeeType.ADMISSION,
-                "examination": FeeType.EXAMINATION,
-                "library": FeeType.LIBRARY,
-                "laboratory": FeeType.LABORATORY,
-                "sports": FeeType.SPORTS,
-                "transport": FeeType.TRANSPORT,
-                "hostel": FeeType.HOSTEL,
-                "mess": FeeType.MESS,
-                "other": FeeType.OTHER,
-            }
-            
-            fee_type = fee_type_map.get(fee_type_str)
+            fee_type = FEE_TYPE_MAP.get(fee_type_str)
             if not fee_type:
-                results["errors"].append({
-                    "row": row_num,
-                    "error": f"Invalid fee_type '{fee_type_str}'. Valid: tuition, admission, examination, library, sports, transport, hostel, other"
-                })
+                results["errors"].append((row_num, f"Invalid fee_type '{fee_type_str}'. Valid: {VALID_FEE_TYPES}"))
                 return False
             
             # Parse fee amount
             try:
                 fee_amount = float(fee_amount_str)
             except ValueError:
-                results["errors"].append({
-                    "row": row_num,
-                    "error": f"Invalid fee_amount '{fee_amount_str}'. Must be a number."
-                })
+                results["errors"].append((row_num, f"Invalid fee_amount '{fee_amount_str}'. Must be a number."))
                 return False
             
             # Parse due date
             due_date = None
             if row.get("fee_due_date"):
+                due_text = row["fee_due_date"]
                 try:
-                    due_date = datetime.strptime(row["fee_due_date"], "%Y-%m-%d").date()
+                    if _is_iso_date_text(due_text):
+                        due_date = date.fromisoformat(due_text)
+                    else:
+                        # Non-zero-padded dates such as 2024-6-30
+                        due_date = datetime.strptime(due_text, "%Y-%m-%d").date()
                 except ValueError:
                     due_date = date.today()
             
@@ -810,15 +1286,8 @@ class ImportExportService:
                  academic_year = f"{start_year}-{end_year_short}"
             
             # Check for existing fee to avoid duplicates
-            existing_fee_result = await self.db.execute(
-                select(FeePayment).where(
-                    FeePayment.student_id == student.id,
-                    FeePayment.fee_type == fee_type,
-                    FeePayment.academic_year == academic_year,
-                    FeePayment.tenant_id == tenant_id,
-                )
-            )
-            existing_fee = existing_fee_result.scalars().first()
+            fee_key = (student.id, fee_type, academic_year)
+            existing_fee = self._fees_by_key.get(fee_key)
             
             if existing_fee:
                 # If already paid, do not update amount/date and do not duplicate
@@ -826,6 +1295,7 @@ class ImportExportService:
                     return False
                     
                 # Update existing pending/partial fee
+                self._attach(existing_fee)
                 existing_fee.total_amount = fee_amount
                 # Only update due date if provided in file
                 if due_date:
@@ -838,10 +1308,11 @@ class ImportExportService:
                 return False # Existing fee updated, not created
             
             # Generate transaction ID
-            transaction_id = f"IMP-{uuid.uuid4().hex[:8].upper()}"
+            transaction_id = f"{self._transaction_prefix}{next(self._transaction_seq):06X}"
             
             # Create fee payment record
             fee_payment = FeePayment(
+                id=uuid.uuid4(),
                 tenant_id=tenant_id,
                 transaction_id=transaction_id,
                 student_id=student.id,
@@ -853,28 +1324,97 @@ class ImportExportService:
                 due_date=due_date,
                 status=PaymentStatus.PENDING,
             )
-            self.db.add(fee_payment)
+            self._pending_fees.append(fee_payment)  # inserted with the next batch
+            self._fees_by_key[fee_key] = fee_payment
             return True
             
         except Exception as e:
-            results["errors"].append({
-                "row": row_num,
-                "error": f"Fee creation failed: {str(e)}"
-            })
+            results["errors"].append((row_num, f"Fee creation failed: {str(e)}"))
             return False
     
     # ============== Student Export ==============
     
-    async def export_students_to_csv(
+    async def _stream_copy_csv(self, query) -> AsyncIterator[bytes]:
+        """
+        Stream a Core select as COPY (...) TO STDOUT in CSV format with a header row.
+        Postgres formats every row, so no Row or ORM objects are built; column labels
+        become the CSV headers. COPY output is re-chunked to EXPORT_COPY_CHUNK_BYTES and
+        handed over through a small queue, so the server is only read as fast as the
+        client downloads. Runs on its own session, since a streamed response outlives
+        the request's session.
+        """
+        async with AsyncSessionLocal() as session:
+            connection = await session.connection()
+            compiled = query.compile(dialect=connection.dialect)
+            params = [compiled.params[name] for name in compiled.positiontup]
+            raw_connection = await connection.get_raw_connection()
+            
+            chunks: asyncio.Queue = asyncio.Queue(maxsize=4)
+            pending = bytearray()
+            
+            async def collect(data: bytes) -> None:
+                pending.extend(data)
+                if len(pending) >= EXPORT_COPY_CHUNK_BYTES:
+                    await chunks.put(bytes(pending))
+                    pending.clear()
+            
+            async def run_copy() -> None:
+                try:
+                    await raw_connection.driver_connection.copy_from_query(
+                        str(compiled), *params, output=collect, format="csv", header=True
+                    )
+                    if pending:
+                        await chunks.put(bytes(pending))
+                finally:
+                    await chunks.put(None)
+            
+            copy_task = asyncio.create_task(run_copy())
+            try:
+                while (chunk := await chunks.get()) is not None:
+                    yield chunk
+                await copy_task  # surfaces a failed COPY
+            finally:
+                if not copy_task.done():
+                    # Client went away mid-download: stop the COPY before the session is closed
+                    copy_task.cancel()
+                    try:
+                        await copy_task
+                    except asyncio.CancelledError:
+                        pass
+    
+    async def _stream_csv(
         self,
-        tenant_id: str,
-        status: Optional[StudentStatus] = None,
-    ) -> bytes:
+        headers: Sequence[str],
+        query,
+        format_rows: Callable[[Sequence[Any]], Iterable[Sequence[Any]]],
+    ) -> AsyncIterator[bytes]:
         """
-        Export students to CSV format.
-        Excludes soft-deleted students.
+        Stream a CSV export as encoded chunks: the header row, then one chunk per
+        EXPORT_STREAM_BATCH_SIZE rows read through a server-side cursor.
+        Runs on its own session, since a streamed response outlives the request's session.
+        """
+        # Rows are encoded into the byte buffer as csv.writer emits them (write_through),
+        # so each chunk exists once as bytes rather than as a str plus its encoded copy
+        buffer = BytesIO()
+        writer = csv.writer(TextIOWrapper(buffer, encoding='utf-8', newline='', write_through=True))
+        writer.writerow(headers)
+        yield buffer.getvalue()
+        
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query.execution_options(yield_per=EXPORT_STREAM_BATCH_SIZE))
+            async for partition in result.partitions():
+                buffer.seek(0)
+                buffer.truncate(0)
+                writer.writerows(format_rows(partition))
+                yield buffer.getvalue()
+    
+    def _student_export_query(self, tenant_id: str, status: Optional[StudentStatus] = None):
         """
-        query = select(Student).where(
+        Non-deleted students for export, newest first. Selects only the exported
+        columns (STUDENT_EXPORT_HEADERS are Student attribute names), so rows come
+        back as plain Row tuples without ORM identity-map bookkeeping.
+        """
+        query = select(*[getattr(Student, name) for name in STUDENT_EXPORT_HEADERS]).where(
             Student.tenant_id == tenant_id,
             Student.is_deleted == False,  # Exclude deleted students
         )
@@ -882,113 +1422,33 @@ class ImportExportService:
         if status:
             query = query.where(Student.status == status)
         
-        query = query.order_by(Student.created_at.desc())
-        
-        result = await self.db.execute(query)
-        students = result.scalars().all()
-        
-        # Create CSV
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Headers matching the import template
-        headers = [
-            "id",
-            "admission_number",
-            "first_name",
-            "middle_name",
-            "last_name",
-            "date_of_birth",
-            "gender",
-            "blood_group",
-            "nationality",
-            "religion",
-            "caste",
-            "category",
-            "email",
-            "phone",
-            "alternate_phone",
-            "address_line1",
-            "address_line2",
-            "city",
-            "state",
-            "pincode",
-            "country",
-            "father_name",
-            "father_phone",
-            "father_occupation",
-            "mother_name",
-            "mother_phone",
-            "mother_occupation",
-            "guardian_name",
-            "guardian_phone",
-            "guardian_relation",
-            "parent_email",
-            "roll_number",
-            "class_id",
-            "course",
-            "department",
-            "batch",
-            "section",
-            "semester",
-            "year",
-            "admission_date",
-            "admission_type",
-            "status",
-            "created_at",
-        ]
-        writer.writerow(headers)
-        
-        # Data rows
-        for student in students:
-            row = [
-                str(student.id),
-                student.admission_number or "",
-                student.first_name or "",
-                student.middle_name or "",
-                student.last_name or "",
-                student.date_of_birth.strftime("%Y-%m-%d") if student.date_of_birth else "",
-                student.gender.value if student.gender else "",
-                student.blood_group or "",
-                student.nationality or "",
-                student.religion or "",
-                student.caste or "",
-                student.category or "",
-                student.email or "",
-                student.phone or "",
-                student.alternate_phone or "",
-                student.address_line1 or "",
-                student.address_line2 or "",
-                student.city or "",
-                student.state or "",
-                student.pincode or "",
-                student.country or "",
-                student.father_name or "",
-                student.father_phone or "",
-                student.father_occupation or "",
-                student.mother_name or "",
-                student.mother_phone or "",
-                student.mother_occupation or "",
-                student.guardian_name or "",
-                student.guardian_phone or "",
-                student.guardian_relation or "",
-                student.parent_email or "",
-                student.roll_number or "",
-                str(student.class_id) if student.class_id else "",
-                student.course or "",
-                student.department or "",
-                student.batch or "",
-                student.section or "",
-                str(student.semester) if student.semester else "",
-                str(student.year) if student.year else "",
-                student.admission_date.strftime("%Y-%m-%d") if student.admission_date else "",
-                student.admission_type or "",
-                student.status.value if student.status else "",
-                student.created_at.strftime("%Y-%m-%d %H:%M:%S") if student.created_at else "",
-            ]
-            writer.writerow(row)
-        
-        return output.getvalue().encode('utf-8')
+        return query.order_by(Student.created_at.desc())
+    
+    def stream_students_csv(
+        self,
+        tenant_id: str,
+        status: Optional[StudentStatus] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the student CSV export as encoded chunks.
+        Excludes soft-deleted students.
+        """
+        return self._stream_csv(
+            STUDENT_EXPORT_HEADERS,
+            self._student_export_query(tenant_id, status),
+            lambda students: map(_student_csv_row, students),
+        )
+    
+    async def export_students_to_csv(
+        self,
+        tenant_id: str,
+        status: Optional[StudentStatus] = None,
+    ) -> bytes:
+        """
+        Export students to CSV format.
+        Excludes soft-deleted students.
+        """
+        return b"".join([chunk async for chunk in self.stream_students_csv(tenant_id, status)])
     
     async def export_students_to_excel(
         self,
@@ -999,50 +1459,61 @@ class ImportExportService:
         Export students to Excel format.
         Excludes soft-deleted students.
         """
-        if not self.has_pandas or not self.has_openpyxl:
-            raise RuntimeError("pandas and openpyxl are required for Excel export")
-        
-        import pandas as pd
-        
-        query = select(Student).where(
-            Student.tenant_id == tenant_id,
-            Student.is_deleted == False,  # Exclude deleted students
+        if not self.has_openpyxl:
+            raise RuntimeError("openpyxl is required for Excel export")
+        
+        from openpyxl import Workbook
+        
+        # Only the exported columns; class name comes from an outer join in the same query
+        query = (
+            select(
+                Student.id, Student.first_name, Student.last_name, Student.email, Student.phone,
+                Student.date_of_birth, Student.gender, Student.admission_number, Student.roll_number,
+                SchoolClass.name.label("class_name"), Student.section, Student.status,
+                Student.guardian_name, Student.guardian_phone, Student.created_at,
+            )
+            .outerjoin(SchoolClass, Student.class_id == SchoolClass.id)
+            .where(
+                Student.tenant_id == tenant_id,
+                Student.is_deleted == False,  # Exclude deleted students
+            )
         )
         
         if status:
             query = query.where(Student.status == status)
         
-        result = await self.db.execute(query)
-        students = result.scalars().all()
-        
-        # Convert to list of dicts
-        data = []
-        for student in students:
-            data.append({
-                "ID": str(student.id),
-                "First Name": student.first_name,
-                "Last Name": student.last_name or "",
-                "Email": student.email or "",
-                "Phone": student.phone or "",
-                "Date of Birth": student.date_of_birth.strftime("%Y-%m-%d") if student.date_of_birth else "",
-                "Gender": student.gender.value if student.gender else "",
-                "Admission Number": student.admission_number or "",
-                "Roll Number": student.roll_number or "",
-                "Class": student.class_name or "",
-                "Section": student.section or "",
-                "Status": student.status.value if student.status else "",
-                "Guardian Name": student.guardian_name or "",
-                "Guardian Phone": student.guardian_phone or "",
-                "Created At": student.created_at.strftime("%Y-%m-%d") if student.created_at else "",
-            })
-        
-        df = pd.DataFrame(data)
+        # Write-only workbook: rows are serialized as they are appended, with no
+        # per-cell objects or DataFrame copy held in memory.
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Students")
+        sheet.append([
+            "ID", "First Name", "Last Name", "Email", "Phone", "Date of Birth", "Gender",
+            "Admission Number", "Roll Number", "Class", "Section", "Status",
+            "Guardian Name", "Guardian Phone", "Created At",
+        ])
+        
+        result = await self.db.stream(query.execution_options(yield_per=EXPORT_STREAM_BATCH_SIZE))
+        async for student in result:
+            sheet.append([
+                str(student.id),
+                student.first_name,
+                student.last_name or "",
+                student.email or "",
+                student.phone or "",
+                student.date_of_birth.isoformat() if student.date_of_birth else "",
+                student.gender.value if student.gender else "",
+                student.admission_number or "",
+                student.roll_number or "",
+                student.class_name or "",
+                student.section or "",
+                student.status.value if student.status else "",
+                student.guardian_name or "",
+                student.guardian_phone or "",
+                student.created_at.date().isoformat() if student.created_at else "",
+            ])
         
         output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Students', index=False)
-        
-        output.seek(0)
+        workbook.save(output)
         return output.getvalue()
     
     # ============== Import from Excel ==============
@@ -1057,10 +1528,8 @@ class ImportExportService:
         """
         Import students from Excel file with class linking and fee assignment.
         """
-        if not self.has_pandas:
-            raise RuntimeError("pandas is required for Excel import")
-        
-        import pandas as pd
+        if not self.has_openpyxl:
+            raise RuntimeError("openpyxl is required for Excel import")
         
         results = {
             "total_rows": 0,
@@ -1074,71 +1543,43 @@ class ImportExportService:
         
         try:
             # Pre-load all classes for this tenant for efficient lookup
-            class_result = await self.db.execute(
-                select(SchoolClass).where(
-                    SchoolClass.tenant_id == tenant_id,
-                    SchoolClass.is_deleted == False
-                )
-            )
-            classes = class_result.scalars().all()
-
+            class_result = await self.db.execute(self._class_lookup_query(tenant_id))
+            self._index_classes(list(class_result.all()))
             
-            # Read Excel file
-            df = pd.read_excel(BytesIO(file_content))
+            # Stream the sheet (cells as text, empty cells as ""); each batch is parsed in a
+            # worker thread and its possible duplicates are pre-loaded before it is processed
+            self._reset_import_lookups()
+            rows = self._iter_rows_with_lookups(tenant_id, _iter_excel_rows(file_content), match_email=False)
             
-            # Normalize column names
-            df.columns = [str(col).lower().replace(" ", "_") for col in df.columns]
-            
-            results["total_rows"] = len(df)
-            
-            for idx, row in df.iterrows():
-                row_num = idx + 2  # Excel row number (1-indexed, plus header)
+            row_num = 1  # Row 1 is headers
+            async for row_dict in rows:
+                row_num += 1
+                results["total_rows"] += 1
+                if len(self._pending_students) + len(self._pending_fees) >= IMPORT_FLUSH_BATCH_SIZE:
+                    await self._flush_import_batch()
                 try:
-                    row_dict = row.to_dict()
-                    
-                    # Convert NaN to empty string
-                    for key, value in row_dict.items():
-                        if pd.isna(value):
-                            row_dict[key] = ""
-                        elif isinstance(value, float) and value.is_integer():
-                            row_dict[key] = str(int(value))
-                        else:
-                            row_dict[key] = str(value)
-                    
                     # Validate required fields
                     if not row_dict.get("first_name"):
-                        results["errors"].append({
-                            "row": row_num,
-                            "error": "first_name is required"
-                        })
+                        results["errors"].append((row_num, "first_name is required"))
                         continue
                     
                     # Look up class_id
-                    class_id, class_error = self._resolve_class_id(classes, row_dict)
+                    class_id, class_error = self._resolve_class_id(row_dict)
                     if class_error:
-                        results["errors"].append({
-                            "row": row_num,
-                            "error": class_error
-                        })
+                        results["errors"].append((row_num, class_error))
                         continue
                     
                     # Check for duplicates
-                    existing = None
-                    if row_dict.get("admission_number"):
-                        existing_result = await self.db.execute(
-                            select(Student).where(
-                                Student.tenant_id == tenant_id,
-                                Student.admission_number == row_dict["admission_number"],
-                            ).order_by(Student.is_deleted.asc(), Student.updated_at.desc())
-                        )
-                        existing = existing_result.scalars().first()
+                    existing = self._find_existing_student(row_dict, match_email=False)
                     
                     if existing:
                         # Handle soft-deleted students - Reactivate and Update
                         if existing.is_deleted:
+                            self._attach(existing)
                             existing.is_deleted = False
                             existing.status = StudentStatus.ACTIVE
                             await self._update_student_from_row(existing, row_dict, class_id)
+                            self._remember_student(existing)
                             # Create fees
                             fee_created = await self._create_fee_for_student(tenant_id, existing, row_dict, row_num, results)
                             if fee_created:
@@ -1159,16 +1600,12 @@ class ImportExportService:
                         elif skip_duplicates:
                             results["skipped"] += 1
                         else:
-                            results["errors"].append({
-                                "row": row_num,
-                                "error": f"Duplicate student: {row_dict.get('admission_number')}"
-                            })
+                            results["errors"].append((row_num, f"Duplicate student: {row_dict.get('admission_number')}"))
                         continue
                     
                     # Create new student with class_id
                     student = self._create_student_from_row(tenant_id, row_dict, class_id)
-                    self.db.add(student)
-                    await self.db.flush()  # Get student.id before creating fee
+                    self._queue_new_student(student)  # id is assigned client-side, so fees can reference it unflushed
                     
                     # Create fee payment if fee details provided
                     fee_created = await self._create_fee_for_student(tenant_id, student, row_dict, row_num, results)
@@ -1179,114 +1616,138 @@ class ImportExportService:
                     results["imported_ids"].append(student.id)
                     
                 except Exception as e:
-                    results["errors"].append({
-                        "row": row_num,
-                        "error": str(e)
-                    })
+                    results["errors"].append((row_num, str(e)))
             
+            await self._flush_import_batch()
             await self.db.commit()
             
         except Exception as e:
             logger.error(f"Failed to import students from Excel: {str(e)}")
-            results["errors"].append({"row": 0, "error": f"File parsing error: {str(e)}"})
+            results["errors"].append((0, f"File parsing error: {str(e)}"))
+        finally:
+            results["errors"] = _error_dicts(results["errors"])
         
         return results
 
     # ============== Fee Export ==============
     
+    def _fee_export_query(self, tenant_id: str):
+        """Column-only select for fee exports; amounts are formatted by Postgres (to_char)."""
+        return select(
+            FeePayment.transaction_id,
+            FeePayment.student_id,
+            FeePayment.fee_type,
+            func.to_char(FeePayment.total_amount, AMOUNT_FORMAT).label("total_amount"),
+            func.to_char(FeePayment.paid_amount, AMOUNT_FORMAT).label("paid_amount"),
+            func.to_char(
+                FeePayment.total_amount - func.coalesce(FeePayment.paid_amount, 0), AMOUNT_FORMAT
+            ).label("balance"),
+            FeePayment.due_date,
+            FeePayment.payment_date,
+            FeePayment.payment_method,
+            FeePayment.status,
+            FeePayment.notes,
+        ).where(FeePayment.tenant_id == tenant_id)
+    
+    def stream_fees_csv(self, tenant_id: str) -> AsyncIterator[bytes]:
+        """Stream the fee CSV export as encoded chunks."""
+        query = self._fee_export_query(tenant_id).order_by(FeePayment.payment_date.desc())
+        return self._stream_csv(FEE_EXPORT_HEADERS, query, _format_fee_rows)
+    
     async def export_fees_to_csv(self, tenant_id: str) -> bytes:
         """Export fees to CSV."""
-        query = select(FeePayment).where(FeePayment.tenant_id == tenant_id).order_by(FeePayment.payment_date.desc())
-        result = await self.db.execute(query)
-        payments = result.scalars().all()
+        return b"".join([chunk async for chunk in self.stream_fees_csv(tenant_id)])
+    
+    async def export_fees_to_zip(self, tenant_id: str) -> bytes:
+        """
+        Export fees as a ZIP of monthly CSV shards (by payment_date).
+        Each shard runs on its own pooled session so large tenants export in parallel;
+        fees without a payment date go into fees_unpaid.csv.
+        """
+        # Only months that actually have payments get a shard (no empty months in between)
+        payment_month = func.date_trunc("month", FeePayment.payment_date).label("payment_month")
+        months = await self.db.execute(
+            select(payment_month)
+            .where(FeePayment.tenant_id == tenant_id, FeePayment.payment_date.isnot(None))
+            .distinct()
+            .order_by(payment_month)
+        )
         
-        output = StringIO()
-        writer = csv.writer(output)
+        shards: List[Tuple[str, Optional[datetime], Optional[datetime]]] = [("fees_unpaid.csv", None, None)]
+        for start in months.scalars():
+            end = datetime(start.year + 1, 1, 1) if start.month == 12 else datetime(start.year, start.month + 1, 1)
+            shards.append((f"fees_{start.strftime('%Y_%m')}.csv", start, end))
         
-        headers = ["Transaction ID", "Student ID", "Fee Type", "Total Amount", "Paid Amount", "Balance", "Start Date", "Due Date", "Frequency", "Payment Date", "Payment Method", "Status", "Notes"]
-        writer.writerow(headers)
+        semaphore = asyncio.Semaphore(EXPORT_SHARD_CONCURRENCY)
         
-        for p in payments:
-            writer.writerow([
-                p.transaction_id,
-                str(p.student_id),
-                p.fee_type.value if hasattr(p.fee_type, 'value') else str(p.fee_type),
-                p.total_amount,
-                p.paid_amount,
-                p.total_amount - p.paid_amount,
-                str(p.start_date) if p.start_date else "",
-                str(p.due_date) if p.due_date else "",
-                p.frequency.value if hasattr(p.frequency, 'value') else str(p.frequency),
-                str(p.payment_date) if p.payment_date else "",
-                p.payment_method.value if hasattr(p.payment_method, 'value') else str(p.payment_method),
-                p.status.value if hasattr(p.status, 'value') else str(p.status),
-                p.notes or ""
-            ])
-            
-        return output.getvalue().encode('utf-8')
+        async def export_shard(name: str, start: Optional[datetime], end: Optional[datetime]) -> Tuple[str, List[bytes]]:
+            query = self._fee_export_query(tenant_id)
+            if start is None:
+                query = query.where(FeePayment.payment_date.is_(None))
+            else:
+                query = query.where(FeePayment.payment_date >= start, FeePayment.payment_date < end)
+            async with semaphore:
+                # _stream_csv opens the shard's own session and reads it in yield_per batches
+                chunks = self._stream_csv(FEE_EXPORT_HEADERS, query.order_by(FeePayment.payment_date.desc()), _format_fee_rows)
+                return name, [chunk async for chunk in chunks]
+        
+        output = BytesIO()
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+            # Each shard is compressed into the archive as soon as it finishes, so only the
+            # shards still in flight are held in memory, not the whole export
+            for shard in asyncio.as_completed([export_shard(*shard) for shard in shards]):
+                name, chunks = await shard
+                with archive.open(name, "w") as entry:
+                    for chunk in chunks:
+                        entry.write(chunk)
+        return output.getvalue()
 
     # ============== Attendance Export ==============
     
-    async def export_attendance_to_csv(self, tenant_id: str) -> bytes:
+    def stream_attendance_csv(self, tenant_id: str, sort: bool = False) -> AsyncIterator[bytes]:
+        """
+        Stream the attendance CSV export as encoded chunks.
+        Rows are only ordered by date (newest first) when sort is requested,
+        which avoids a server-side sort over the whole attendance table.
+        """
+        query = select(
+            Attendance.attendance_date,
+            Attendance.student_id,
+            Attendance.status,
+            Attendance.remarks,
+            Attendance.marked_by,
+        ).where(Attendance.tenant_id == tenant_id)
+        if sort:
+            query = query.order_by(Attendance.attendance_date.desc())
+        return self._stream_csv(
+            ["Date", "Student ID", "Status", "Remarks", "Recorded By"],
+            query,
+            lambda records: map(_attendance_csv_row, records),
+        )
+    
+    async def export_attendance_to_csv(self, tenant_id: str, sort: bool = False) -> bytes:
         """Export attendance to CSV."""
-        query = select(Attendance).where(Attendance.tenant_id == tenant_id).order_by(Attendance.date.desc())
-        result = await self.db.execute(query)
-        records = result.scalars().all()
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        headers = ["Date", "Student ID", "Status", "Remarks", "Recorded By"]
-        writer.writerow(headers)
-        
-        for r in records:
-            writer.writerow([
-                str(r.date),
-                str(r.student_id),
-                r.status.value if hasattr(r.status, 'value') else str(r.status),
-                r.remarks or "",
-                str(r.recorded_by) if r.recorded_by else ""
-            ])
-            
-        return output.getvalue().encode('utf-8')
+        return b"".join([chunk async for chunk in self.stream_attendance_csv(tenant_id, sort=sort)])
 
     # ============== Staff Import/Export ==============
 
     # ============== Staff Import/Export ==============
 
     def get_staff_import_template(self) -> bytes:
-        """Generate CSV template for staff import."""
-        headers = [
-            "first_name", "last_name", "email", "phone", "employee_id", 
-            "staff_type", "designation", "department", "qualification", 
-            "joining_date", "gender", "date_of_birth", "address", "city", "state",
-            "classes" # Comma separated Class Name-Section (e.g. "10-A, 9-B")
-        ]
-        sample = [
-            "John", "Smith", "john.smith@school.com", "+919876543210", "EMP001",
-            "teaching", "Senior Teacher", "Science", "M.Sc. Physics",
-            "2023-06-01", "male", "1985-05-15", "123 Teacher Colony", "Mumbai", "Maharashtra",
-            "10-A, 9-B"
-        ]
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerow(sample)
-        return output.getvalue().encode('utf-8')
+        """CSV template for staff import."""
+        return STAFF_IMPORT_TEMPLATE_CSV
 
     async def import_staff_from_csv(self, tenant_id: str, file_content: bytes) -> Dict[str, Any]:
         """Import staff from CSV."""
-        return await self._import_staff_generic(tenant_id, file_content.decode('utf-8'), is_csv=True)
+        return await self._import_staff_generic(tenant_id, file_content, is_csv=True)
 
     async def import_staff_from_excel(self, tenant_id: str, file_content: bytes) -> Dict[str, Any]:
         """Import staff from Excel."""
-        if not self.has_pandas:
-            raise RuntimeError("pandas is required for Excel import")
-        import pandas as pd
-        df = pd.read_excel(BytesIO(file_content))
+        if not self.has_openpyxl:
+            raise RuntimeError("openpyxl is required for Excel import")
         # Convert to CSV-like structure for generic processing
-        return await self._import_staff_generic(tenant_id, df, is_csv=False)
+        rows = await asyncio.to_thread(_read_excel_rows, file_content)
+        return await self._import_staff_generic(tenant_id, rows, is_csv=False)
 
     async def _import_staff_generic(self, tenant_id: str, data: Any, is_csv: bool) -> Dict[str, Any]:
         """Generic staff import logic."""
@@ -1294,88 +1755,60 @@ class ImportExportService:
         
         try:
             # Pre-load classes for resolution
-            class_result = await self.db.execute(
-                select(SchoolClass).where(
-                    SchoolClass.tenant_id == tenant_id, 
-                    SchoolClass.is_deleted == False
-                )
-            )
-            all_classes = class_result.scalars().all()
+            class_result = await self.db.execute(self._class_lookup_query(tenant_id))
+            self._index_classes(list(class_result.all()))
 
             rows = []
             if is_csv:
-                io_obj = StringIO(data)
-                reader = csv.DictReader(io_obj)
-                # Normalize headers
-                if reader.fieldnames:
-                    reader.fieldnames = [h.strip().lower().replace(' ', '_') for h in reader.fieldnames]
-                rows = list(reader)
+                rows = list(_csv_dict_reader(data))
             else:
-                # Pandas DataFrame
-                data.columns = [str(col).strip().lower().replace(" ", "_") for col in data.columns]
-                rows = data.to_dict('records')
+                # Row dicts from _read_excel_rows (headers already normalized)
+                rows = data
 
             results["total_rows"] = len(rows)
+            
+            # Clean data
+            rows = [{k: str(v).strip() if v is not None else "" for k, v in row.items()} for row in rows]
+            
+            # Load the emails/employee IDs this file could collide with in one query
+            taken_emails, taken_employee_ids = await self._existing_staff_keys(
+                tenant_id,
+                emails={row["email"] for row in rows if row.get("email")},
+                employee_ids={row["employee_id"] for row in rows if row.get("employee_id")},
+            )
+            
+            # New staff and their class links go out as Core bulk INSERTs, not per-row ORM adds
+            staff_rows: List[Dict[str, Any]] = []
+            class_links: List[Dict[str, Any]] = []
 
             for idx, row in enumerate(rows):
                 row_num = idx + 2
+                if len(staff_rows) >= IMPORT_FLUSH_BATCH_SIZE:
+                    await self._write_behind(self._insert_staff_batch(staff_rows, class_links))
+                    staff_rows, class_links = [], []
                 try:
-                    # Clean data
-                    row = {k: str(v).strip() if v is not None else "" for k, v in row.items()}
-                    
                     if not row.get("first_name") or not row.get("email"):
                         results["errors"].append({"row": row_num, "error": "first_name and email are required"})
                         continue
 
                     # Check existence
-                    existing = await self.db.execute(select(Staff).where(
-                        Staff.tenant_id == tenant_id,
-                        (Staff.email == row["email"]) | (Staff.employee_id == row.get("employee_id"))
-                    ))
-                    existing_staff = existing.scalars().first()
-                    
-                    if existing_staff:
+                    employee_id = row.get("employee_id")
+                    if row["email"] in taken_emails or (employee_id and employee_id in taken_employee_ids):
                          # For now, skip duplicates. Could add update mode later.
                         results["errors"].append({"row": row_num, "error": f"Staff with email {row['email']} or ID {row.get('employee_id')} already exists"})
                         continue
 
-                    # Map Enums
-                    staff_type = StaffType.TEACHING
-                    if row.get("staff_type"):
-                        try:
-                            # Try to match enum values (teaching, non_teaching, etc.)
-                            val = row["staff_type"].lower().replace(' ', '_')
-                            # Check if valid
-                            if val in [e.value for e in StaffType]:
-                                staff_type = StaffType(val)
-                        except ValueError:
-                            pass # Default to teaching
-
-                    gender = None
-                    if row.get("gender"):
-                        try:
-                            val = row["gender"].lower()
-                            if val in [e.value for e in Gender]:
-                                gender = Gender(val)
-                        except ValueError:
-                            pass
+                    # Map Enums (teaching, non_teaching, etc.); unknown staff types default to teaching
+                    staff_type = STAFF_TYPE_MAP.get(row.get("staff_type", "").lower().replace(' ', '_'), StaffType.TEACHING)
+                    gender = STAFF_GENDER_MAP.get(row.get("gender", "").lower())
 
                     # Dates
-                    joining_date = None
-                    if row.get("joining_date"):
-                        try:
-                            joining_date = datetime.strptime(row["joining_date"], "%Y-%m-%d").date()
-                        except:
-                            pass
-                            
-                    dob = None
-                    if row.get("date_of_birth"):
-                        try:
-                            dob = datetime.strptime(row["date_of_birth"], "%Y-%m-%d").date()
-                        except:
-                            pass
-
-                    staff = Staff(
+                    joining_date = _parse_date(row.get("joining_date"))
+                    dob = _parse_date(row.get("date_of_birth"))
+
+                    staff_id = uuid.uuid4()
+                    staff_rows.append(dict(
+                        id=staff_id,
                         tenant_id=tenant_id,
                         first_name=row["first_name"],
                         last_name=row.get("last_name"),
@@ -1392,278 +1825,304 @@ class ImportExportService:
                         address=row.get("address"),
                         city=row.get("city"),
                         state=row.get("state"),
-                        status=StaffStatus.ACTIVE
-                    )
+                        status=StaffStatus.ACTIVE,
+                    ))
+                    taken_emails.add(row["email"])
+                    taken_employee_ids.add(staff_rows[-1]["employee_id"])
                     
                     # Handle Classes
                     if row.get("classes"):
                         # specific format: "Class 10-A, Class 9-B" or just "10-A, 9-B"
                         # We try to split by comma and match name-section
                         class_strs = [c.strip() for c in row["classes"].split(',') if c.strip()]
-                        valid_classes = []
                         for c_str in class_strs:
                             # Try splitting by last hyphen for name-section
                             parts = c_str.rsplit('-', 1)
                             if len(parts) == 2:
                                 c_name, c_sec = parts[0].strip(), parts[1].strip()
                                 # Find match
-                                match = next((c for c in all_classes if c.name.lower() == c_name.lower() and c.section.lower() == c_sec.lower()), None)
-                                if match:
-                                    valid_classes.append(match)
-                        
-                        if valid_classes:
-                            staff.associated_classes = valid_classes
-                            
-                    self.db.add(staff)
+                                class_id = self._class_by_ns.get((c_name.lower(), c_sec.lower()))
+                                if class_id:
+                                    class_links.append({"staff_id": staff_id, "class_id": class_id})
+                    
                     results["imported"] += 1
 
                 except Exception as e:
                     results["errors"].append({"row": row_num, "error": str(e)})
 
+            await self._finish_writes()
+            await self._insert_staff_batch(staff_rows, class_links)
             await self.db.commit()
 
         except Exception as e:
             logger.error(f"Staff import failed: {e}")
+            await self._finish_writes(discard=True)
+            await self.db.rollback()
             results["errors"].append({"row": 0, "error": str(e)})
 
         return results
-
-    async def export_staff_to_csv(self, tenant_id: str) -> bytes:
-        # Eager load associated classes
-        from sqlalchemy.orm import selectinload
+    
+    async def _existing_staff_keys(self, tenant_id: str, emails: set, employee_ids: set) -> Tuple[set, set]:
+        """Return the (emails, employee_ids) already used by staff in this tenant, from one IN query."""
+        if not emails and not employee_ids:
+            return set(), set()
         result = await self.db.execute(
-            select(Staff)
-            .options(selectinload(Staff.associated_classes))
-            .where(Staff.tenant_id == tenant_id)
+            select(Staff.email, Staff.employee_id).where(
+                Staff.tenant_id == tenant_id,
+                or_(Staff.email.in_(list(emails)), Staff.employee_id.in_(list(employee_ids))),
+            )
         )
-        staff_list = result.scalars().all()
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        
+        taken_emails, taken_employee_ids = set(), set()
+        for email, employee_id in result:
+            taken_emails.add(email)
+            taken_employee_ids.add(employee_id)
+        return taken_emails, taken_employee_ids
+    
+    async def _insert_staff_batch(self, staff_rows: List[Dict[str, Any]], class_links: List[Dict[str, Any]]) -> None:
+        """Insert queued staff, then their staff_classes links, with one executemany INSERT each."""
+        if staff_rows:
+            await self.db.execute(insert(Staff), staff_rows)
+        if class_links:
+            await self.db.execute(insert(staff_classes), class_links)
+
+    def stream_staff_csv(self, tenant_id: str) -> AsyncIterator[bytes]:
+        """Stream the staff CSV export as encoded chunks."""
+        # Only the exported columns, with each staff member's classes folded into one
+        # "Name-Section, ..." cell by a correlated subquery (no ORM instances, no second query)
+        classes = (
+            select(func.string_agg(func.concat(SchoolClass.name, "-", SchoolClass.section), ", "))
+            .select_from(staff_classes)
+            .join(SchoolClass, SchoolClass.id == staff_classes.c.class_id)
+            .where(staff_classes.c.staff_id == Staff.id)
+            .correlate(Staff)
+            .scalar_subquery()
+        )
+        query = select(
+            Staff.first_name, Staff.last_name, Staff.email, Staff.phone, Staff.employee_id,
+            Staff.staff_type, Staff.designation, Staff.department, Staff.qualification,
+            Staff.joining_date, Staff.gender, Staff.date_of_birth, Staff.address, Staff.city,
+            Staff.state, classes.label("classes"), Staff.status,
+        ).where(Staff.tenant_id == tenant_id)
         headers = [
             "first_name", "last_name", "email", "phone", "employee_id", 
             "staff_type", "designation", "department", "qualification", 
             "joining_date", "gender", "date_of_birth", "address", "city", "state",
             "classes", "status"
         ]
-        writer.writerow(headers)
-        
-        for s in staff_list:
-            # Format classes
-            classes_str = ""
-            if s.associated_classes:
-                classes_str = ", ".join([f"{c.name}-{c.section}" for c in s.associated_classes])
-                
-            writer.writerow([
-                s.first_name,
-                s.last_name or "",
-                s.email or "",
-                s.phone or "",
-                s.employee_id,
-                s.staff_type.value if s.staff_type else "",
-                s.designation or "",
-                s.department or "",
-                s.qualification or "",
-                s.joining_date.strftime("%Y-%m-%d") if s.joining_date else "",
-                s.gender.value if s.gender else "",
-                s.date_of_birth.strftime("%Y-%m-%d") if s.date_of_birth else "",
-                s.address or "",
-                s.city or "",
-                s.state or "",
-                classes_str,
-                s.status.value
-            ])
-        return output.getvalue().encode('utf-8')
+        return self._stream_csv(headers, query, lambda staff: map(_staff_csv_row, staff))
+
+    async def export_staff_to_csv(self, tenant_id: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream_staff_csv(tenant_id)])
 
     # ============== Timetable Import/Export ==============
 
     def get_timetable_import_template(self) -> bytes:
-        headers = [
-            "day", "start_time", "end_time", "class", "section", 
-            "subject", "teacher_email_or_id", "room", "slot_type"
-        ]
-        sample = [
-            "Monday", "09:00", "10:00", "10", "A", 
-            "Mathematics", "john.smith@school.com", "Room 101", "class"
-        ]
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerow(sample)
-        return output.getvalue().encode('utf-8')
+        return TIMETABLE_IMPORT_TEMPLATE_CSV
 
     async def import_timetable_from_csv(self, tenant_id: str, file_content: bytes) -> Dict[str, Any]:
-        return await self._import_timetable_generic(tenant_id, file_content.decode('utf-8'), is_csv=True)
+        return await self._import_timetable_generic(tenant_id, file_content, is_csv=True)
 
     async def import_timetable_from_excel(self, tenant_id: str, file_content: bytes) -> Dict[str, Any]:
-        if not self.has_pandas:
-            raise RuntimeError("pandas required")
-        import pandas as pd
-        df = pd.read_excel(BytesIO(file_content))
-        return await self._import_timetable_generic(tenant_id, df, is_csv=False)
+        if not self.has_openpyxl:
+            raise RuntimeError("openpyxl is required for Excel import")
+        rows = await asyncio.to_thread(_read_excel_rows, file_content)
+        return await self._import_timetable_generic(tenant_id, rows, is_csv=False)
 
     async def _import_timetable_generic(self, tenant_id: str, data: Any, is_csv: bool) -> Dict[str, Any]:
         results = {"total_rows": 0, "imported": 0, "errors": []}
         
-        # Helper: Get DayOfWeek
-        day_map = {d.name.lower(): d for d in DayOfWeek}
-        
         try:
             # Load required data for lookups
-            staff_result = await self.db.execute(select(Staff).where(Staff.tenant_id == tenant_id))
-            staff_list = staff_result.scalars().all()
-            staff_map = {s.email: s.id for s in staff_list if s.email}
-            staff_map.update({s.employee_id: s.id for s in staff_list if s.employee_id}) # Allow lookup by ID too
+            staff_result = await self.db.execute(
+                select(Staff.id, Staff.email, Staff.employee_id).where(Staff.tenant_id == tenant_id)
+            )
+            staff_list = staff_result.all()
+            # Keys are lowercased once here so each row needs a single case-insensitive lookup
+            staff_map = {s.email.lower(): s.id for s in staff_list if s.email}
+            staff_map.update({s.employee_id.lower(): s.id for s in staff_list if s.employee_id}) # Allow lookup by ID too
             
             # Rooms setup (optional lookup if strict validation needed, else create/use string)
             # For now we'll fetch rooms to map if possible, but TimetableEntry uses room_id
-            room_result = await self.db.execute(select(Room).where(Room.tenant_id == tenant_id))
-            rooms = room_result.scalars().all()
-            room_map = {r.name.lower(): r.id for r in rooms}
+            room_result = await self.db.execute(select(Room.id, Room.name).where(Room.tenant_id == tenant_id))
+            room_map = {name.lower(): room_id for room_id, name in room_result.all()}
 
-            rows = []
+            # Pre-load time slots so each row is a dict lookup instead of a query
+            slot_result = await self.db.execute(
+                select(TimeSlot.id, TimeSlot.start_time, TimeSlot.end_time).where(TimeSlot.tenant_id == tenant_id)
+            )
+            slot_map = {(st, et): slot_id for slot_id, st, et in slot_result.all()}
+
+            # Rows are consumed straight from the reader rather than materialized up front;
+            # the CSV bytes are decoded and parsed in a worker thread (_rows_in_thread)
             if is_csv:
-                reader = csv.DictReader(StringIO(data))
-                if reader.fieldnames:
-                    reader.fieldnames = [h.strip().lower().replace(' ', '_') for h in reader.fieldnames]
-                rows = list(reader)
+                rows = _csv_dict_reader(data)
             else:
-                data.columns = [str(c).strip().lower().replace(' ', '_') for c in data.columns]
-                rows = data.to_dict('records')
+                # Row dicts from _read_excel_rows (headers already normalized)
+                rows = data
 
-            results["total_rows"] = len(rows)
+            # New slots and entries go out as Core bulk INSERTs, not per-row ORM adds
+            slot_rows: List[Dict[str, Any]] = []
+            entry_rows: List[Dict[str, Any]] = []
 
-            for idx, row in enumerate(rows):
-                row_num = idx + 2
-                try:
-                    row = {k: str(v).strip() for k, v in row.items() if v is not None}
-                    
-                    if not row.get("day") or not row.get("start_time"):
-                        results["errors"].append({"row": row_num, "error": "Day and Start Time required"})
-                        continue
+            async for row in _rows_in_thread(rows):
+                results["total_rows"] += 1
+                row_num = results["total_rows"] + 1
+                if len(entry_rows) >= IMPORT_FLUSH_BATCH_SIZE:
+                    await self._write_behind(self._insert_timetable_batch(slot_rows, entry_rows))
+                    slot_rows, entry_rows = [], []
+                # Reader values are already text; only the fields used are stripped
+                day = _get_str(row, "day")
+                start_time = _get_str(row, "start_time")
+                end_time = _get_str(row, "end_time")
+                if not day or not start_time:
+                    results["errors"].append({"row": row_num, "error": "Day and Start Time required"})
+                    continue
 
-                    # Parse Day
-                    day_enum = day_map.get(row["day"].lower())
-                    if not day_enum:
-                         results["errors"].append({"row": row_num, "error": f"Invalid day: {row['day']}"})
-                         continue
+                # Parse Day
+                day_enum = DAY_OF_WEEK_MAP.get(day.lower())
+                if not day_enum:
+                     results["errors"].append({"row": row_num, "error": f"Invalid day: {day}"})
+                     continue
 
-                    # Parse/Find TimeSlot - Complex: Using start/end time to find or create slot
-                    # Strategy: Try to find existing slot by start/end time. If not, create? 
-                    # Simpler strategy: Use TimeSlot if it exists, else we need logic.
-                    # For bulk import, let's look up TimeSlot by start/end.
-                    try:
-                        st = datetime.strptime(row["start_time"], "%H:%M").time()
-                        et = datetime.strptime(row["end_time"], "%H:%M").time()
-                    except ValueError:
-                        results["errors"].append({"row": row_num, "error": "Invalid time format (HH:MM)"})
-                        continue
-
-                    slot_q = select(TimeSlot).where(
-                        TimeSlot.tenant_id == tenant_id,
-                        TimeSlot.start_time == st,
-                        TimeSlot.end_time == et
-                    )
-                    slot = (await self.db.execute(slot_q)).scalars().first()
-                    
-                    if not slot:
-                        # Auto-create slot?
-                        slot = TimeSlot(
-                            tenant_id=tenant_id,
-                            name=f"{row['start_time']}-{row['end_time']}",
-                            start_time=st,
-                            end_time=et
-                        )
-                        self.db.add(slot)
-                        await self.db.flush()
-
-                    # Teacher
-                    teacher_id = None
-                    t_identifier = row.get("teacher_email_or_id")
-                    if t_identifier:
-                        teacher_id = staff_map.get(t_identifier) or staff_map.get(t_identifier.lower()) # check case-insensitive maybe?
-                    
-                    # Room
-                    room_id = None
-                    if row.get("room"):
-                        room_id = room_map.get(row["room"].lower())
+                # Parse/Find TimeSlot - Complex: Using start/end time to find or create slot
+                # Strategy: Try to find existing slot by start/end time. If not, create? 
+                # Simpler strategy: Use TimeSlot if it exists, else we need logic.
+                # For bulk import, let's look up TimeSlot by start/end.
+                try:
+                    st = _parse_hhmm(start_time)
+                    et = _parse_hhmm(end_time)
+                except (ValueError, OverflowError):
+                    results["errors"].append({"row": row_num, "error": "Invalid time format (HH:MM)"})
+                    continue
 
-                    entry = TimetableEntry(
+                slot_id = slot_map.get((st, et))
+                
+                if not slot_id:
+                    # Auto-create slot; inserted ahead of the entries in the same batch
+                    slot_id = uuid.uuid4()
+                    slot_rows.append(dict(
+                        id=slot_id,
                         tenant_id=tenant_id,
-                        time_slot_id=slot.id,
-                        day_of_week=day_enum,
-                        class_name=row.get("class"),
-                        section=row.get("section"),
-                        subject_name=row.get("subject"),
-                        teacher_id=teacher_id,
-                        room_id=room_id,
-                        status=TimetableStatus.ACTIVE
-                    )
-                    self.db.add(entry)
-                    results["imported"] += 1
+                        name=f"{start_time}-{end_time}",
+                        start_time=st,
+                        end_time=et
+                    ))
+                    slot_map[(st, et)] = slot_id
 
-                except Exception as e:
-                     results["errors"].append({"row": row_num, "error": str(e)})
+                # Teacher
+                t_identifier = _get_str(row, "teacher_email_or_id")
+                teacher_id = staff_map.get(t_identifier.lower()) if t_identifier else None
+                
+                # Room
+                room = _get_str(row, "room")
+                room_id = room_map.get(room.lower()) if room else None
 
+                entry_rows.append(dict(
+                    id=uuid.uuid4(),
+                    tenant_id=tenant_id,
+                    time_slot_id=slot_id,
+                    day_of_week=day_enum,
+                    class_name=_get_str(row, "class"),
+                    section=_get_str(row, "section"),
+                    subject_name=_get_str(row, "subject"),
+                    teacher_id=teacher_id,
+                    room_id=room_id,
+                    status=TimetableStatus.ACTIVE
+                ))
+                results["imported"] += 1
+
+            await self._finish_writes()
+            await self._insert_timetable_batch(slot_rows, entry_rows)
             await self.db.commit()
 
         except Exception as e:
             logger.error(f"Timetable import failed: {e}")
+            await self._finish_writes(discard=True)
+            await self.db.rollback()
             results["errors"].append({"row": 0, "error": str(e)})
             
         return results
 
+    async def _insert_timetable_batch(self, slot_rows: List[Dict[str, Any]], entry_rows: List[Dict[str, Any]]) -> None:
+        """Insert queued time slots, then the entries that reference them, with one executemany INSERT each."""
+        if slot_rows:
+            await self.db.execute(insert(TimeSlot), slot_rows)
+        if entry_rows:
+            await self.db.execute(insert(TimetableEntry), entry_rows)
+
+    async def _write_behind(self, write: Coroutine[Any, Any, Any]) -> None:
+        """
+        Start a batch INSERT in the background once the previous one has finished, so the
+        next batch is validated while this one is on the wire. Only one write is ever in
+        flight, so the session is never used concurrently; _finish_writes() must run before
+        anything else touches the session.
+        """
+        try:
+            await self._finish_writes()
+        except BaseException:
+            write.close()
+            raise
+        self._batch_write = asyncio.create_task(write)
+
+    async def _finish_writes(self, discard: bool = False) -> None:
+        """
+        Wait for the in-flight batch write, if any, re-raising its error. On the error
+        path (discard=True) its error is swallowed instead: the write is still awaited
+        rather than cancelled, so the connection is idle before the caller rolls back.
+        """
+        write, self._batch_write = self._batch_write, None
+        if write is None:
+            return
+        if discard:
+            try:
+                await write
+            except Exception:
+                pass
+            return
+        await write
+
+    def stream_timetable_csv(self, tenant_id: str) -> AsyncIterator[bytes]:
+        """Stream the timetable CSV export as encoded chunks."""
+        # Joins and formatting happen server-side; Postgres writes the CSV via COPY
+        query = (
+            select(
+                func.initcap(cast(TimetableEntry.day_of_week, String)).label("Day"),
+                func.concat(
+                    func.to_char(TimeSlot.start_time, "HH24:MI"), "-", func.to_char(TimeSlot.end_time, "HH24:MI")
+                ).label("Time Slot"),
+                TimetableEntry.class_name.label("Class"),
+                TimetableEntry.section.label("Section"),
+                TimetableEntry.subject_name.label("Subject"),
+                _staff_full_name().label("Teacher"),
+                Room.name.label("Room"),
+            )
+            .join(TimeSlot, TimetableEntry.time_slot)
+            .outerjoin(Staff, TimetableEntry.teacher)
+            .outerjoin(Room, TimetableEntry.room)
+            .where(TimetableEntry.tenant_id == tenant_id)
+            .order_by(TimetableEntry.day_of_week, TimetableEntry.time_slot_id)
+        )
+        return self._stream_copy_csv(query)
+
     async def export_timetable_to_csv(self, tenant_id: str) -> bytes:
-        # Simple flat export
-        query = select(TimetableEntry).where(TimetableEntry.tenant_id == tenant_id).order_by(TimetableEntry.day_of_week, TimetableEntry.time_slot_id)
-        entries = (await self.db.execute(query)).scalars().all()
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        headers = ["Day", "Time Slot", "Class", "Section", "Subject", "Teacher", "Room"]
-        writer.writerow(headers)
-        
-        for e in entries:
-            # Need to lazy load or joined load relations for efficient export, doing simplified here
-            # Assuming relations might not be loaded, using IDs or safe access if loaded
-            # Real prod code should use joinedload in query
-            writer.writerow([
-                e.day_of_week.name.title(),
-                f"{e.time_slot.start_time.strftime('%H:%M')}-{e.time_slot.end_time.strftime('%H:%M')}" if e.time_slot else "",
-                e.class_name or "",
-                e.section or "",
-                e.subject_name or "",
-                str(e.teacher_id) if e.teacher_id else "", # ideally resolve name
-                str(e.room_id) if e.room_id else ""
-            ])
-            
-        return output.getvalue().encode('utf-8')
+        return b"".join([chunk async for chunk in self.stream_timetable_csv(tenant_id)])
 
     # ============== Classes Import/Export ==============
 
     def get_classes_import_template(self) -> bytes:
-        """Generate CSV template for classes import."""
-        headers = ["name", "section", "capacity", "class_teacher_email"]
-        sample = ["10", "A", "40", "teacher@example.com"]
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerow(sample)
-        return output.getvalue().encode('utf-8')
+        """CSV template for classes import."""
+        return CLASSES_IMPORT_TEMPLATE_CSV
 
     async def import_classes_from_csv(self, tenant_id: str, file_content: bytes) -> Dict[str, Any]:
         """Import classes from CSV."""
-        return await self._import_classes_generic(tenant_id, file_content.decode('utf-8'), is_csv=True)
+        return await self._import_classes_generic(tenant_id, file_content, is_csv=True)
 
     async def import_classes_from_excel(self, tenant_id: str, file_content: bytes) -> Dict[str, Any]:
         """Import classes from Excel."""
-        if not self.has_pandas:
-            raise RuntimeError("pandas is required for Excel import")
-        import pandas as pd
-        df = pd.read_excel(BytesIO(file_content))
-        return await self._import_classes_generic(tenant_id, df, is_csv=False)
+        if not self.has_openpyxl:
+            raise RuntimeError("openpyxl is required for Excel import")
+        rows = await asyncio.to_thread(_read_excel_rows, file_content)
+        return await self._import_classes_generic(tenant_id, rows, is_csv=False)
 
     async def _import_classes_generic(self, tenant_id: str, data: Any, is_csv: bool) -> Dict[str, Any]:
         """Generic classes import logic."""
@@ -1672,129 +2131,108 @@ class ImportExportService:
         try:
             # Pre-load existing classes
             existing_classes_result = await self.db.execute(
-                select(SchoolClass).where(
+                select(SchoolClass.name, SchoolClass.section).where(
                     SchoolClass.tenant_id == tenant_id,
                     SchoolClass.is_deleted == False
                 )
             )
-            existing_classes = {(c.name.lower(), c.section.lower()) for c in existing_classes_result.scalars().all()}
+            existing_classes = {(name.lower(), section.lower()) for name, section in existing_classes_result.all()}
             
             # Pre-load staff for teacher lookup
             staff_result = await self.db.execute(
-                select(Staff).where(Staff.tenant_id == tenant_id)
+                select(Staff.email, Staff.id).where(Staff.tenant_id == tenant_id)
             )
-            staff_map = {s.email.lower(): s.id for s in staff_result.scalars().all() if s.email}
+            staff_map = {email.lower(): staff_id for email, staff_id in staff_result.all() if email}
 
-            rows = []
+            # Rows are consumed straight from the reader rather than materialized up front;
+            # the CSV bytes are decoded and parsed in a worker thread (_rows_in_thread)
             if is_csv:
-                io_obj = StringIO(data)
-                reader = csv.DictReader(io_obj)
-                if reader.fieldnames:
-                    reader.fieldnames = [h.strip().lower().replace(' ', '_') for h in reader.fieldnames]
-                rows = list(reader)
+                rows = _csv_dict_reader(data)
             else:
-                data.columns = [str(col).strip().lower().replace(" ", "_") for col in data.columns]
-                rows = data.to_dict('records')
+                # Row dicts from _read_excel_rows (headers already normalized)
+                rows = data
             
-            results["total_rows"] = len(rows)
+            # New classes go out as Core bulk INSERTs, not per-row ORM adds
+            class_rows: List[Dict[str, Any]] = []
             
-            for idx, row in enumerate(rows):
-                row_num = idx + 2
-                try:
-                    row = {k: str(v).strip() if v is not None else "" for k, v in row.items()}
+            async for row in _rows_in_thread(rows):
+                results["total_rows"] += 1
+                row_num = results["total_rows"] + 1
+                if len(class_rows) >= IMPORT_FLUSH_BATCH_SIZE:
+                    await self._write_behind(self.db.execute(insert(SchoolClass), class_rows))
+                    class_rows = []
+                # Reader values are already text; only the fields used are stripped
+                name = _get_str(row, "name")
+                section = _get_str(row, "section")
+                if not name or not section:
+                    results["errors"].append({"row": row_num, "error": "name and section are required"})
+                    continue
                     
-                    if not row.get("name") or not row.get("section"):
-                        results["errors"].append({"row": row_num, "error": "name and section are required"})
-                        continue
-                        
-                    # Check uniqueness
-                    if (row["name"].lower(), row["section"].lower()) in existing_classes:
-                        results["errors"].append({"row": row_num, "error": f"Class {row['name']}-{row['section']} already exists"})
+                # Check uniqueness
+                class_key = (name.lower(), section.lower())
+                if class_key in existing_classes:
+                    results["errors"].append({"row": row_num, "error": f"Class {name}-{section} already exists"})
+                    continue
+                
+                # Teacher Lookup (an unknown email leaves the class without a teacher)
+                teacher_email = _get_str(row, "class_teacher_email")
+                class_teacher_id = staff_map.get(teacher_email.lower()) if teacher_email else None
+
+                # Capacity
+                capacity = 40
+                capacity_text = _get_str(row, "capacity")
+                if capacity_text:
+                    try:
+                        capacity = int(float(capacity_text))
+                    except (ValueError, OverflowError):  # "abc", "inf"
+                        results["errors"].append({"row": row_num, "error": "Capacity must be a number"})
                         continue
-                    
-                    # Teacher Lookup
-                    class_teacher_id = None
-                    if row.get("class_teacher_email"):
-                        class_teacher_id = staff_map.get(row["class_teacher_email"].lower())
-                        if not class_teacher_id:
-                             # Warning but continue
-                             pass
-
-                    # Capacity
-                    capacity = 40
-                    if row.get("capacity"):
-                        try:
-                            capacity = int(float(row["capacity"]))
-                        except ValueError:
-                            results["errors"].append({"row": row_num, "error": "Capacity must be a number"})
-                            continue
 
-                    new_class = SchoolClass(
-                        tenant_id=tenant_id,
-                        name=row["name"],
-                        section=row["section"],
-                        capacity=capacity,
-                        class_teacher_id=class_teacher_id
-                    )
-                    self.db.add(new_class)
-                    # Add to local set to catch duplicates within the file
-                    existing_classes.add((row["name"].lower(), row["section"].lower()))
-                    results["imported"] += 1
-                    
-                except Exception as e:
-                    results["errors"].append({"row": row_num, "error": str(e)})
+                class_rows.append(dict(
+                    id=uuid.uuid4(),
+                    tenant_id=tenant_id,
+                    name=name,
+                    section=section,
+                    capacity=capacity,
+                    class_teacher_id=class_teacher_id
+                ))
+                # Add to local set to catch duplicates within the file
+                existing_classes.add(class_key)
+                results["imported"] += 1
                     
+            await self._finish_writes()
+            if class_rows:
+                await self.db.execute(insert(SchoolClass), class_rows)
             await self.db.commit()
             
         except Exception as e:
             logger.error(f"Classes import failed: {e}")
+            await self._finish_writes(discard=True)
+            await self.db.rollback()
             results["errors"].append({"row": 0, "error": str(e)})
             
         return results
 
-    async def export_classes_to_csv(self, tenant_id: str) -> bytes:
-        """Export classes to CSV."""
-        from sqlalchemy.orm import selectinload
-        # Eager load class teacher
-        result = await self.db.execute(
-            select(SchoolClass)
-            .options(selectinload(SchoolClass.class_teacher))
+    def stream_classes_csv(self, tenant_id: str) -> AsyncIterator[bytes]:
+        """Stream the classes CSV export as encoded chunks."""
+        # Teacher and live-student count are joined in one aggregated query; Postgres writes the CSV via COPY
+        query = (
+            select(
+                SchoolClass.name.label("name"),
+                SchoolClass.section.label("section"),
+                SchoolClass.capacity.label("capacity"),
+                _staff_full_name().label("class_teacher_name"),
+                Staff.email.label("class_teacher_email"),
+                func.count(Student.id).label("student_count"),
+            )
+            .outerjoin(Staff, SchoolClass.class_teacher)
+            .outerjoin(Student, and_(Student.class_id == SchoolClass.id, Student.is_deleted == False))
             .where(SchoolClass.tenant_id == tenant_id, SchoolClass.is_deleted == False)
+            .group_by(SchoolClass.id, Staff.id)
             .order_by(SchoolClass.name, SchoolClass.section)
         )
-        classes = result.scalars().all()
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["name", "section", "capacity", "class_teacher_name", "class_teacher_email", "student_count"])
-        
-        # We need student counts efficiently. For now, doing separate query or ignoring. 
-        # Plan said query all classes.
-        # Let's get checks.
-        
-        # Optimization: Fetch counts in one go
-        count_stmt = select(
-            Student.class_id,
-            func.count(Student.id).label('count')
-        ).where(
-            Student.tenant_id == tenant_id,
-            Student.is_deleted == False
-        ).group_by(Student.class_id)
-        count_result = await self.db.execute(count_stmt)
-        counts = {str(row.class_id): row.count for row in count_result.all()}
-        
-        for c in classes:
-            teacher_name = c.class_teacher.full_name if c.class_teacher else ""
-            teacher_email = c.class_teacher.email if c.class_teacher else ""
-            count = counts.get(str(c.id), 0)
-            
-            writer.writerow([
-                c.name,
-                c.section,
-                c.capacity,
-                teacher_name,
-                teacher_email,
-                count
-            ])
-            
-        return output.getvalue().encode('utf-8')
+        return self._stream_copy_csv(query)
+
+    async def export_classes_to_csv(self, tenant_id: str) -> bytes:
+        """Export classes to CSV."""
+        return b"".join([chunk async for chunk in self.stream_classes_csv(tenant_id)])
@@ -1,7 +1,7 @@
 """
 Student Model - Core student entity for the Education ERP
 """
-from sqlalchemy import Column, String, Date, Text, Enum, Integer, Float, Boolean, ForeignKey
+from sqlalchemy import Column, String, Date, Text, Enum, Integer, Float, Boolean, ForeignKey, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
@@ -111,6 +111,17 @@ class Student(TenantBaseModel, SoftDeleteMixin):
     fee_payments = relationship("FeePayment", back_populates="student", lazy="dynamic")
     parent_links = relationship("ParentStudent", back_populates="student", lazy="select")
     
+    __table_args__ = (
+        # Case-insensitive duplicate lookups for bulk import
+        Index('ix_students_tenant_lower_admission_number', 'tenant_id', func.lower(admission_number)),
+        Index('ix_students_tenant_lower_email', 'tenant_id', func.lower(email)),
+        # One live (non-deleted) student per admission number within a tenant
+        Index(
+            'ux_students_tenant_live_admission_number', 'tenant_id', 'admission_number',
+            unique=True, postgresql_where=text('is_deleted = false'),
+        ),
+    )
+    
     @property
     def full_name(self) -> str:
         parts = [self.first_name]
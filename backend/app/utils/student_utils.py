@@ -5,12 +5,38 @@ Handles parsing and exporting student data from/to CSV and Excel files.
 """
 import pandas as pd
 import io
+import re
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import date, datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Accepted date cells, classified up front instead of trying strptime format by format:
+# YYYY-MM-DD, DD/MM/YYYY (or MM/DD/YYYY when the day/month order only fits that way), DD-MM-YYYY
+ISO_DATE_PATTERN = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+SLASH_DATE_PATTERN = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+DASH_DATE_PATTERN = re.compile(r"(\d{1,2})-(\d{1,2})-(\d{4})")
+
+
+def _parse_date_text(value: str) -> Optional[date]:
+    """Parse a date cell in one of the accepted formats; None if it matches none of them."""
+    try:
+        if match := ISO_DATE_PATTERN.fullmatch(value):
+            year, month, day = map(int, match.groups())
+            return date(year, month, day)
+        if match := SLASH_DATE_PATTERN.fullmatch(value):
+            first, second, year = map(int, match.groups())
+            if second <= 12:
+                return date(year, second, first)
+            return date(year, first, second)
+        if match := DASH_DATE_PATTERN.fullmatch(value):
+            day, month, year = map(int, match.groups())
+            return date(year, month, day)
+    except ValueError:
+        pass
+    return None
+
 
 def parse_csv_file(file_content: bytes) -> Tuple[List[Dict[str, Any]], List[str]]:
     """
@@ -74,14 +100,15 @@ def _parse_dataframe(df: pd.DataFrame) -> Tuple[List[Dict[str, Any]], List[str]]
         'pincode', 'roll_number', 'admission_number'
     ]
     
-    for idx, row in df.iterrows():
+    # Plain tuples paired with the column names (iterrows boxes every row in a Series,
+    # to_dict builds a dict per row that is only iterated once)
+    columns = list(df.columns)
+    for idx, values in enumerate(df.itertuples(index=False, name=None)):
         try:
             record = {}
             
             # Map DataFrame columns to student model fields
-            for col in df.columns:
-                value = row[col]
-                
+            for col, value in zip(columns, values):
                 # Handle None/NaN values - skip them for optional fields
                 if value is None or (isinstance(value, float) and np.isnan(value)):
                     continue
@@ -93,18 +120,9 @@ def _parse_dataframe(df: pd.DataFrame) -> Tuple[List[Dict[str, Any]], List[str]]
                 # Convert date fields
                 if col in ['date_of_birth', 'admission_date']:
                     if isinstance(value, str):
-                        try:
-                            # Try various date formats
-                            for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y']:
-                                try:
-                                    parsed_date = datetime.strptime(value, fmt).date()
-                                    record[col] = parsed_date.isoformat()
-                                    break
-                                except ValueError:
-                                    continue
-                        except Exception:
-                            errors.append(f"Row {idx + 2}: Invalid date format for {col}: {value}")
-                            continue
+                        parsed_date = _parse_date_text(value)
+                        if parsed_date:
+                            record[col] = parsed_date.isoformat()
                     elif isinstance(value, (datetime, date)):
                         record[col] = value.isoformat() if isinstance(value, date) else value.date().isoformat()
                     else:
@@ -226,19 +244,21 @@ def export_students_to_excel(students: List[Dict[str, Any]]) -> bytes:
     Returns:
         Excel file content as bytes
     """
-    if not students:
-        # Return empty Excel with headers
-        df = pd.DataFrame(columns=_get_export_columns())
-    else:
-        df = pd.DataFrame(students)
+    from openpyxl import Workbook
+
+    columns = _get_export_columns()
+
+    # Write-only workbook: rows are serialized as they are appended, without
+    # building a DataFrame copy of the records first
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Students')
+    sheet.append(columns)
+    for student in students:
         # Reorder columns to match template
-        df = df.reindex(columns=_get_export_columns(), fill_value='')
-    
-    # Convert to Excel
+        sheet.append([student.get(col, '') for col in columns])
+
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Students', index=False)
-    output.seek(0)
+    workbook.save(output)
     return output.getvalue()
 
 
@@ -0,0 +1,41 @@
+"""add_student_lookup_indexes
+
+Revision ID: add_student_lookup_indexes
+Revises: add_transport_tables
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_student_lookup_indexes'
+down_revision = 'add_transport_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Case-insensitive duplicate lookups used by the student import.
+    # Built CONCURRENTLY so large students tables stay writable.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_students_tenant_lower_admission_number',
+            'students',
+            ['tenant_id', sa.text('lower(admission_number)')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_students_tenant_lower_email',
+            'students',
+            ['tenant_id', sa.text('lower(email)')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_students_tenant_lower_email', table_name='students', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_students_tenant_lower_admission_number', table_name='students', postgresql_concurrently=True, if_exists=True)
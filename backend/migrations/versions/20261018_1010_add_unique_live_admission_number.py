@@ -0,0 +1,36 @@
+"""add_unique_live_admission_number
+
+Revision ID: add_unique_live_admission_number
+Revises: add_student_lookup_indexes
+Create Date: 2026-10-18 10:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_unique_live_admission_number'
+down_revision = 'add_student_lookup_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # At most one non-deleted student per admission number within a tenant.
+    # Soft-deleted students may share the number with a live one.
+    # Fails if live duplicates already exist; resolve those before upgrading.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ux_students_tenant_live_admission_number',
+            'students',
+            ['tenant_id', 'admission_number'],
+            unique=True,
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ux_students_tenant_live_admission_number', table_name='students', postgresql_concurrently=True, if_exists=True)
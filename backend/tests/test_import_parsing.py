@@ -0,0 +1,92 @@
+"""
+Unit tests for the pure parsing/formatting helpers used by bulk import/export.
+They need no database; the modules are skipped when their dependencies are missing.
+"""
+import csv
+import doctest
+import io
+from datetime import date, time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+from app.core.services import import_export_service as service  # noqa: E402
+
+
+def test_class_name_splits_doctests():
+    finder = doctest.DocTestFinder()
+    runner = doctest.DocTestRunner()
+    for test in finder.find(service._class_name_splits, globs=vars(service)):
+        runner.run(test)
+    assert runner.summarize(verbose=False).failed == 0
+
+
+@pytest.mark.parametrize("class_name, splits", [
+    ("Grade 10-A", [("Grade 10", "A"), ("Grade", "10-A")]),
+    ("KG-1 A", [("KG", "1 A"), ("KG-1", "A")]),
+    ("10 A", [("10", "A")]),
+    ("10-B", [("10", "B")]),
+    ("Nursery", []),
+])
+def test_class_name_splits(class_name, splits):
+    assert list(service._class_name_splits(class_name)) == splits
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024-03-05", date(2024, 3, 5)),
+    (" 2024-03-05 ", date(2024, 3, 5)),
+    ("2024/3/5", date(2024, 3, 5)),
+    ("05/03/2024", date(2024, 3, 5)),
+    ("5-3-2024", date(2024, 3, 5)),
+    ("2024-02-30", None),
+    ("2024-W01-1", None),
+    ("2024-03/05", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_date(text, expected):
+    assert service._parse_date(text) == expected
+
+
+def test_parse_hhmm():
+    assert service._parse_hhmm("09:30") == time(9, 30)
+    assert service._parse_hhmm(" 9:05 ") == time(9, 5)
+
+
+@pytest.mark.parametrize("text, error", [
+    (None, ValueError),
+    ("0930", ValueError),
+    ("9:xx", ValueError),
+    ("25:00", ValueError),
+    ("99999999999999999999:00", OverflowError),
+])
+def test_parse_hhmm_invalid(text, error):
+    with pytest.raises(error):
+        service._parse_hhmm(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("M", "male"),
+    ("male", "male"),
+    (" Female ", "female"),
+    ("o", "other"),
+    ("OTHER", "other"),
+    ("mail", None),
+    ("femal", None),
+    ("x", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_gender(text, expected):
+    assert service._parse_gender(text) == expected
+
+
+@pytest.mark.parametrize("fields", [
+    ["plain", "with space", ""],
+    ["comma,inside", 'quote"inside', "line\nbreak", "carriage\rreturn"],
+    ['"', ",", "  padded  "],
+])
+def test_csv_line_matches_csv_writer(fields):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    assert service._csv_line(fields) == buffer.getvalue()
@@ -0,0 +1,20 @@
+"""Unit tests for the date handling in student import parsing."""
+from datetime import date
+
+import pytest
+
+pytest.importorskip("pandas")
+from app.utils.student_utils import _parse_date_text  # noqa: E402
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2005-01-15", date(2005, 1, 15)),
+    ("15/01/2005", date(2005, 1, 15)),
+    ("01/15/2005", date(2005, 1, 15)),
+    ("15-01-2005", date(2005, 1, 15)),
+    ("2005-02-30", None),
+    ("15.01.2005", None),
+    ("", None),
+])
+def test_parse_date_text(text, expected):
+    assert _parse_date_text(text) == expected